@@ -0,0 +1,14 @@
+import tempfile
+
+import pytest
+from django.test.utils import override_settings
+
+
+@pytest.fixture(autouse=True, scope='session')
+def temporary_cache():
+    """Тесты tests/ вызывают cache.clear(): кэш сайта им не отдаём."""
+    from core.test_runner import temporary_caches
+
+    with tempfile.TemporaryDirectory() as directory:
+        with override_settings(CACHES=temporary_caches(directory)):
+            yield
@@ -1,5 +1,20 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.utils.module_loading import autodiscover_modules
 
 
 class CoreConfig(AppConfig):
     name = 'core'
+
+    def ready(self):
+        from . import checks  # noqa: F401
+        from .db import configure_sqlite
+        connection_created.connect(
+            configure_sqlite, dispatch_uid='core.configure_sqlite'
+        )
+        if getattr(settings, 'REQUEST_METRICS_TEMPLATES', False):
+            from .middleware import instrument_templates
+            instrument_templates()
+        # Регистрирует @task из модулей tasks.py всех приложений.
+        autodiscover_modules('tasks')
@@ -0,0 +1,144 @@
+import asyncio
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+SPOOL_SIZE = 1024 * 1024
+
+
+class ASGIHandler:
+    """ASGI-приложение поверх WSGI-обработчика Django 2.2.
+
+    В Django 2.2 ещё нет своего ASGI, поэтому запрос принимается
+    асинхронно: тело читается в цикле событий (крупные загрузки уходят
+    во временный файл), и лишь затем view выполняется в пуле потоков.
+    Ответ отдаётся клиенту тоже асинхронно, по одному фрагменту, так что
+    медленное соединение не держит поток, пока байты идут по сети.
+
+    workers=0 выполняет view прямо в цикле событий — для тестов.
+    """
+
+    def __init__(self, wsgi_application, workers=8, spool_size=SPOOL_SIZE):
+        self.wsgi_application = wsgi_application
+        self.spool_size = spool_size
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix='asgi'
+        ) if workers else None
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self.lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            raise ValueError(
+                f'Неподдерживаемый тип соединения: {scope["type"]}'
+            )
+        body = await self.read_body(receive)
+        if body is None:
+            return
+        environ = self.environ(scope, body)
+        status, headers, chunks = await self.run(self.start, environ)
+        try:
+            await send({
+                'type': 'http.response.start',
+                'status': status,
+                'headers': headers,
+            })
+            iterator = iter(chunks)
+            while True:
+                chunk = await self.run(next, iterator, None)
+                if chunk is None:
+                    break
+                if chunk:
+                    await send({
+                        'type': 'http.response.body',
+                        'body': chunk,
+                        'more_body': True,
+                    })
+            await send({'type': 'http.response.body', 'body': b''})
+        finally:
+            close = getattr(chunks, 'close', None)
+            if close is not None:
+                await self.run(close)
+            body.close()
+
+    async def run(self, function, *args):
+        if self.executor is None:
+            return function(*args)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, function, *args)
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                if self.executor is not None:
+                    self.executor.shutdown(wait=True)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def read_body(self, receive):
+        """Читает тело запроса; None, если клиент отключился."""
+        body = tempfile.SpooledTemporaryFile(max_size=self.spool_size)
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                body.close()
+                return None
+            body.write(message.get('body', b''))
+            if not message.get('more_body', False):
+                break
+        body.seek(0)
+        return body
+
+    def environ(self, scope, body):
+        """WSGI environ по PEP 3333 из ASGI scope."""
+        server = scope.get('server') or ('localhost', 80)
+        client = scope.get('client') or ('', 0)
+        environ = {
+            'REQUEST_METHOD': scope['method'],
+            'SCRIPT_NAME': scope.get('root_path', '').encode().decode(
+                'latin-1'
+            ),
+            'PATH_INFO': scope['path'].encode().decode('latin-1'),
+            'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+            'SERVER_NAME': server[0],
+            'SERVER_PORT': str(server[1]),
+            'SERVER_PROTOCOL': f'HTTP/{scope.get("http_version", "1.1")}',
+            'REMOTE_ADDR': client[0],
+            'REMOTE_PORT': str(client[1]),
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': scope.get('scheme', 'http'),
+            'wsgi.input': body,
+            'wsgi.errors': sys.stderr,
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': True,
+            'wsgi.run_once': False,
+        }
+        for name, value in scope.get('headers', []):
+            name = name.decode('latin-1').upper().replace('-', '_')
+            value = value.decode('latin-1')
+            if name in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+                environ[name] = value
+                continue
+            key = f'HTTP_{name}'
+            if key in environ:
+                value = f'{environ[key]},{value}'
+            environ[key] = value
+        return environ
+
+    def start(self, environ):
+        """Вызывает WSGI-приложение и возвращает статус, заголовки и тело."""
+        response = {}
+
+        def start_response(status, headers, exc_info=None):
+            response['status'] = int(status.split(' ', 1)[0])
+            response['headers'] = [
+                (name.lower().encode('latin-1'), value.encode('latin-1'))
+                for name, value in headers
+            ]
+
+        chunks = self.wsgi_application(environ, start_response)
+        return response['status'], response['headers'], chunks
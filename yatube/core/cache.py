@@ -0,0 +1,299 @@
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+# Ограничение SQLite на число параметров в одном запросе.
+MAX_VARIABLES = 500
+
+SCHEMA = (
+    '''CREATE TABLE IF NOT EXISTS cache (
+        key TEXT PRIMARY KEY,
+        value BLOB NOT NULL,
+        expires REAL,
+        accessed REAL NOT NULL
+    ) WITHOUT ROWID''',
+    'CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed)',
+    '''CREATE TABLE IF NOT EXISTS cache_usage (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        entries INTEGER NOT NULL,
+        bytes INTEGER NOT NULL
+    )''',
+    'INSERT OR IGNORE INTO cache_usage VALUES (1, 0, 0)',
+    '''CREATE TRIGGER IF NOT EXISTS cache_usage_insert
+        AFTER INSERT ON cache BEGIN
+            UPDATE cache_usage SET entries = entries + 1,
+                bytes = bytes + length(NEW.value);
+        END''',
+    '''CREATE TRIGGER IF NOT EXISTS cache_usage_update
+        AFTER UPDATE OF value ON cache BEGIN
+            UPDATE cache_usage
+                SET bytes = bytes + length(NEW.value) - length(OLD.value);
+        END''',
+    '''CREATE TRIGGER IF NOT EXISTS cache_usage_delete
+        AFTER DELETE ON cache BEGIN
+            UPDATE cache_usage SET entries = entries - 1,
+                bytes = bytes - length(OLD.value);
+        END''',
+)
+
+
+class SQLiteCache(BaseCache):
+    """Общий для всех процессов кэш в файле SQLite.
+
+    В отличие от LocMemCache, все воркеры одного хоста видят одни и те же
+    записи, поэтому инвалидация и счётчики версий действуют сразу везде.
+    Целые числа хранятся как INTEGER, и incr() выполняется одним
+    UPDATE без чтения значения в Python.
+
+    Дополнительные OPTIONS:
+        MAX_ENTRIES, CULL_FREQUENCY — как у встроенных бэкендов;
+        MAX_SIZE — предельный объём значений в байтах;
+        TOUCH_INTERVAL — как часто (в секундах) обновлять отметку
+        последнего обращения для вытеснения по LRU.
+    """
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        self._path = location
+        options = params.get('OPTIONS', {})
+        self._max_size = int(options.get('MAX_SIZE', 64 * 1024 * 1024))
+        self._touch_interval = float(options.get('TOUCH_INTERVAL', 1))
+        self._local = threading.local()
+
+    def _connection(self):
+        local = self._local
+        if getattr(local, 'pid', None) != os.getpid():
+            directory = os.path.dirname(self._path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(
+                self._path, timeout=30, isolation_level=None,
+                check_same_thread=False,
+            )
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            for statement in SCHEMA:
+                connection.execute(statement)
+            local.connection = connection
+            local.pid = os.getpid()
+        return local.connection
+
+    def _transaction(self):
+        return _Transaction(self._connection())
+
+    @staticmethod
+    def _encode(value):
+        if type(value) is int:
+            return value
+        return pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def _decode(value):
+        if isinstance(value, int):
+            return value
+        return pickle.loads(value)
+
+    def _key(self, key, version):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        return key
+
+    def _fetch(self, keys):
+        """Читает записи без блокировки на запись.
+
+        Просроченные записи удаляются, а отметка обращения для LRU
+        обновляется отдельной короткой транзакцией и не чаще, чем раз
+        в TOUCH_INTERVAL секунд.
+        """
+        now = time.time()
+        connection = self._connection()
+        rows = []
+        for start in range(0, len(keys), MAX_VARIABLES):
+            chunk = keys[start:start + MAX_VARIABLES]
+            placeholders = ','.join('?' * len(chunk))
+            rows.extend(connection.execute(
+                f'SELECT key, value, expires, accessed FROM cache '
+                f'WHERE key IN ({placeholders})',
+                chunk,
+            ))
+        found = {}
+        expired = []
+        stale = []
+        for key, value, expires, accessed in rows:
+            if expires is not None and expires <= now:
+                expired.append((key, now))
+                continue
+            found[key] = self._decode(value)
+            if now - accessed > self._touch_interval:
+                stale.append((now, key))
+        if expired or stale:
+            with self._transaction() as connection:
+                connection.executemany(
+                    'DELETE FROM cache WHERE key = ? AND expires <= ?',
+                    expired,
+                )
+                connection.executemany(
+                    'UPDATE cache SET accessed = ? WHERE key = ?', stale
+                )
+        return found
+
+    def _store(self, connection, items, timeout, only_new=False):
+        now = time.time()
+        expires = self.get_backend_timeout(timeout)
+        rows = [(key, self._encode(value), expires, now)
+                for key, value in items]
+        if only_new:
+            cursor = connection.execute(
+                'INSERT INTO cache (key, value, expires, accessed) '
+                'VALUES (?, ?, ?, ?) ON CONFLICT (key) DO UPDATE SET '
+                'value = excluded.value, expires = excluded.expires, '
+                'accessed = excluded.accessed '
+                'WHERE cache.expires IS NOT NULL AND cache.expires <= ?',
+                (*rows[0], now),
+            )
+            stored = cursor.rowcount > 0
+        else:
+            connection.executemany(
+                'INSERT INTO cache (key, value, expires, accessed) '
+                'VALUES (?, ?, ?, ?) ON CONFLICT (key) DO UPDATE SET '
+                'value = excluded.value, expires = excluded.expires, '
+                'accessed = excluded.accessed',
+                rows,
+            )
+            stored = True
+        self._cull(connection, now)
+        return stored
+
+    def _cull(self, connection, now):
+        entries, size = connection.execute(
+            'SELECT entries, bytes FROM cache_usage'
+        ).fetchone()
+        if entries <= self._max_entries and size <= self._max_size:
+            return
+        connection.execute(
+            'DELETE FROM cache WHERE expires IS NOT NULL AND expires <= ?',
+            (now,),
+        )
+        entries, size = connection.execute(
+            'SELECT entries, bytes FROM cache_usage'
+        ).fetchone()
+        if entries <= self._max_entries and size <= self._max_size:
+            return
+        if self._cull_frequency == 0:
+            connection.execute('DELETE FROM cache')
+            return
+        connection.execute(
+            'DELETE FROM cache WHERE key IN (SELECT key FROM cache '
+            'ORDER BY accessed LIMIT ?)',
+            (max(1, entries // self._cull_frequency),),
+        )
+
+    def get(self, key, default=None, version=None):
+        key = self._key(key, version)
+        return self._fetch([key]).get(key, default)
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        if not keys:
+            return {}
+        mapping = {self._key(key, version): key for key in keys}
+        found = self._fetch(list(mapping))
+        return {mapping[key]: value for key, value in found.items()}
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self._key(key, version)
+        with self._transaction() as connection:
+            self._store(connection, [(key, value)], timeout)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        if not data:
+            return []
+        items = [(self._key(key, version), value)
+                 for key, value in data.items()]
+        with self._transaction() as connection:
+            self._store(connection, items, timeout)
+        return []
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self._key(key, version)
+        with self._transaction() as connection:
+            return self._store(
+                connection, [(key, value)], timeout, only_new=True
+            )
+
+    def incr(self, key, delta=1, version=None):
+        key = self._key(key, version)
+        with self._transaction() as connection:
+            cursor = connection.execute(
+                'UPDATE cache SET value = value + ? WHERE key = ? '
+                "AND typeof(value) = 'integer' "
+                'AND (expires IS NULL OR expires > ?)',
+                (delta, key, time.time()),
+            )
+            if not cursor.rowcount:
+                raise ValueError(f"Key '{key}' not found")
+            return connection.execute(
+                'SELECT value FROM cache WHERE key = ?', (key,)
+            ).fetchone()[0]
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self._key(key, version)
+        with self._transaction() as connection:
+            cursor = connection.execute(
+                'UPDATE cache SET expires = ? WHERE key = ? '
+                'AND (expires IS NULL OR expires > ?)',
+                (self.get_backend_timeout(timeout), key, time.time()),
+            )
+            return cursor.rowcount > 0
+
+    def has_key(self, key, version=None):
+        key = self._key(key, version)
+        row = self._connection().execute(
+            'SELECT 1 FROM cache WHERE key = ? '
+            'AND (expires IS NULL OR expires > ?)',
+            (key, time.time()),
+        ).fetchone()
+        return row is not None
+
+    def delete(self, key, version=None):
+        key = self._key(key, version)
+        with self._transaction() as connection:
+            connection.execute('DELETE FROM cache WHERE key = ?', (key,))
+
+    def delete_many(self, keys, version=None):
+        rows = [(self._key(key, version),) for key in keys]
+        with self._transaction() as connection:
+            connection.executemany('DELETE FROM cache WHERE key = ?', rows)
+
+    def clear(self):
+        with self._transaction() as connection:
+            connection.execute('DELETE FROM cache')
+
+    def close(self, **kwargs):
+        # Соединение живёт весь срок процесса: открывать файл на каждый
+        # запрос дороже, чем держать его.
+        pass
+
+
+class _Transaction:
+    """BEGIN IMMEDIATE … COMMIT.
+
+    Пишущие операции сразу берут блокировку и не ждут её апгрейда.
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def __enter__(self):
+        self.connection.execute('BEGIN IMMEDIATE')
+        return self.connection
+
+    def __exit__(self, exc_type, exc, traceback):
+        if exc_type is None:
+            self.connection.execute('COMMIT')
+        else:
+            self.connection.execute('ROLLBACK')
@@ -0,0 +1,139 @@
+from collections import Counter
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestFilesMixin
+from django.core.checks import Warning, register
+from django.utils.module_loading import import_string
+
+TAG = 'performance'
+CACHED_LOADER = 'django.template.loaders.cached.Loader'
+LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+@register(TAG, deploy=True)
+def check_debug(app_configs, **kwargs):
+    if not settings.DEBUG:
+        return []
+    return [Warning(
+        'DEBUG включён.',
+        hint='Каждый SQL-запрос копится в connection.queries, а медиа '
+             'раздаёт Django. Используйте yatube.settings_production.',
+        id='core.W001',
+    )]
+
+
+@register(TAG, deploy=True)
+def check_templates(app_configs, **kwargs):
+    errors = []
+    for backend in settings.TEMPLATES:
+        options = backend.get('OPTIONS', {})
+        loaders = options.get('loaders')
+        # Без явных загрузчиков Django сам кэширует шаблоны при DEBUG=False.
+        if loaders is not None and not any(
+            isinstance(loader, (list, tuple)) and loader[0] == CACHED_LOADER
+            for loader in loaders
+        ):
+            errors.append(Warning(
+                'Шаблоны загружаются без кэширующего загрузчика.',
+                hint='Включите TEMPLATE_CACHE=1: иначе шаблоны читаются '
+                     'и разбираются заново при каждом рендере.',
+                obj=backend['BACKEND'],
+                id='core.W002',
+            ))
+        duplicates = [
+            name for name, count in Counter(
+                options.get('context_processors', [])
+            ).items() if count > 1
+        ]
+        if duplicates:
+            errors.append(Warning(
+                'Контекстные процессоры подключены несколько раз: '
+                + ', '.join(duplicates),
+                hint='Каждый из них выполняется при каждом рендере.',
+                obj=backend['BACKEND'],
+                id='core.W003',
+            ))
+    return errors
+
+
+@register(TAG, deploy=True)
+def check_static_storage(app_configs, **kwargs):
+    storage = import_string(settings.STATICFILES_STORAGE)
+    if issubclass(storage, ManifestFilesMixin):
+        return []
+    return [Warning(
+        'Имена статических файлов не содержат хэша содержимого.',
+        hint="Используйте 'core.storage.CompressedManifestStaticFilesStorage'"
+             ': без хэша статику нельзя кэшировать надолго.',
+        id='core.W010',
+    )]
+
+
+@register(TAG, deploy=True)
+def check_databases(app_configs, **kwargs):
+    errors = []
+    journal_mode = str(
+        getattr(settings, 'SQLITE_PRAGMAS', {}).get('journal_mode', '')
+    ).lower()
+    for alias, database in settings.DATABASES.items():
+        if database['ENGINE'].endswith('sqlite3'):
+            if journal_mode != 'wal':
+                errors.append(Warning(
+                    'SQLite работает без журнала WAL.',
+                    hint="Добавьте 'journal_mode': 'wal' в SQLITE_PRAGMAS: "
+                         'иначе запись блокирует чтение.',
+                    obj=alias,
+                    id='core.W004',
+                ))
+        elif not database.get('CONN_MAX_AGE'):
+            errors.append(Warning(
+                'Соединение с базой открывается заново на каждый запрос.',
+                hint='Задайте DATABASE_CONN_MAX_AGE больше нуля.',
+                obj=alias,
+                id='core.W005',
+            ))
+    return errors
+
+
+@register(TAG, deploy=True)
+def check_caches(app_configs, **kwargs):
+    backend = settings.CACHES['default']['BACKEND']
+    errors = []
+    if backend in LOCAL_CACHES:
+        errors.append(Warning(
+            f'Кэш по умолчанию — {backend}.',
+            hint='Кэш страниц и фрагментов не общий для процессов '
+                 'или выключен совсем.',
+            id='core.W006',
+        ))
+    if settings.SESSION_ENGINE == 'django.contrib.sessions.backends.db':
+        errors.append(Warning(
+            'Сессии читаются из базы на каждом запросе.',
+            hint="Используйте 'django.contrib.sessions.backends.cached_db'.",
+            id='core.W007',
+        ))
+    return errors
+
+
+@register(TAG, deploy=True)
+def check_side_effects(app_configs, **kwargs):
+    errors = []
+    if getattr(settings, 'TASKS_EAGER', False):
+        errors.append(Warning(
+            'Фоновые задачи выполняются внутри запроса (TASKS_EAGER).',
+            hint='Выключите TASKS_EAGER и запустите manage.py run_worker.',
+            id='core.W008',
+        ))
+    level = settings.LOGGING.get('loggers', {}).get(
+        'django.db.backends', {}
+    ).get('level', '')
+    if level == 'DEBUG':
+        errors.append(Warning(
+            'Логгер django.db.backends пишет каждый SQL-запрос.',
+            hint='Поднимите его уровень до INFO или выше.',
+            id='core.W009',
+        ))
+    return errors
@@ -0,0 +1,32 @@
+import json
+import logging
+import os
+from datetime import datetime, timezone
+from logging.handlers import RotatingFileHandler
+
+
+class JSONLinesFormatter(logging.Formatter):
+    """Одна запись — одна строка JSON с отметкой времени и уровнем."""
+
+    def format(self, record):
+        payload = record.msg if isinstance(record.msg, dict) else {
+            'message': record.getMessage(),
+        }
+        return json.dumps({
+            'time': datetime.fromtimestamp(
+                record.created, timezone.utc
+            ).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            **payload,
+        }, ensure_ascii=False, default=str)
+
+
+class RotatingLogHandler(RotatingFileHandler):
+    """RotatingFileHandler, который сам создаёт каталог для лога."""
+
+    def __init__(self, filename, *args, **kwargs):
+        directory = os.path.dirname(filename)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        super().__init__(filename, *args, **kwargs)
@@ -0,0 +1,173 @@
+import asyncio
+import io
+import json
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.core.wsgi import get_wsgi_application
+
+from core.asgi import ASGIHandler
+from core.metrics import summarize
+
+
+class Command(BaseCommand):
+    help = (
+        'Модель синхронных WSGI-воркеров и ASGI при медленных клиентах: '
+        'каждый клиент медленно загружает тело запроса и медленно читает '
+        'ответ. Показывает время прогона, задержки, число одновременно '
+        'обслуживаемых соединений и пик памяти Python. Это не замер '
+        'настоящих серверов: медленная сеть WSGI-воркера изображается '
+        'time.sleep в пуле потоков, обе схемы работают в одном процессе, '
+        'а память — это tracemalloc этого процесса без учёта отдельных '
+        'процессов gunicorn. Для итоговых цифр гоняйте нагрузку по '
+        'gunicorn yatube.wsgi и uvicorn yatube.asgi.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clients', type=int, default=64)
+        parser.add_argument(
+            '--workers', type=int, default=8,
+            help='Воркеров WSGI и потоков ASGI для view.',
+        )
+        parser.add_argument(
+            '--chunks', type=int, default=5,
+            help='Сколько пауз делает медленный клиент при загрузке.',
+        )
+        parser.add_argument(
+            '--delay', type=float, default=0.05,
+            help='Пауза клиента между фрагментами, секунд.',
+        )
+        parser.add_argument('--chunk-size', type=int, default=16 * 1024)
+        parser.add_argument('--path', default='/')
+        parser.add_argument(
+            '--output', help='Сохранить результаты в JSON-файл.'
+        )
+
+    def scope(self, options):
+        path, _, query = options['path'].partition('?')
+        return {
+            'type': 'http',
+            'method': 'GET',
+            'path': path,
+            'query_string': query.encode(),
+            'headers': [(b'host', b'localhost')],
+            'server': ('localhost', 80),
+            'client': ('127.0.0.1', 0),
+        }
+
+    def enter(self):
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    def leave(self):
+        with self.lock:
+            self.in_flight -= 1
+
+    def run_wsgi(self, handler, options):
+        """Синхронный воркер занят соединением целиком.
+
+        Медленный клиент изображается паузой, на которую поток-воркер
+        занят так же, как воркер gunicorn на чтении сокета.
+        """
+        body = b'x' * options['chunk_size'] * options['chunks']
+        slow_client = options['delay'] * options['chunks']
+
+        def connection(_):
+            started = time.perf_counter()
+            self.enter()
+            time.sleep(slow_client)
+            environ = handler.environ(self.scope(options), io.BytesIO(body))
+            status, _, chunks = handler.start(environ)
+            b''.join(chunks)
+            chunks.close()
+            time.sleep(slow_client)
+            self.leave()
+            return status, time.perf_counter() - started
+
+        with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+            return list(pool.map(connection, range(options['clients'])))
+
+    def run_asgi(self, handler, options):
+        """Медленные фазы соединения — ожидание в цикле событий."""
+        async def connection():
+            started = time.perf_counter()
+            parts = [b'x' * options['chunk_size']] * options['chunks']
+            response = {}
+
+            async def receive():
+                if not parts:
+                    return {'type': 'http.request', 'body': b''}
+                await asyncio.sleep(options['delay'])
+                return {
+                    'type': 'http.request',
+                    'body': parts.pop(),
+                    'more_body': True,
+                }
+
+            async def send(message):
+                if message['type'] == 'http.response.start':
+                    response['status'] = message['status']
+                elif not message.get('more_body'):
+                    await asyncio.sleep(options['delay'] * options['chunks'])
+
+            self.enter()
+            await handler(self.scope(options), receive, send)
+            self.leave()
+            return response['status'], time.perf_counter() - started
+
+        async def main():
+            return await asyncio.gather(*(
+                connection() for _ in range(options['clients'])
+            ))
+
+        return asyncio.run(main())
+
+    def handle(self, *args, **options):
+        wsgi = get_wsgi_application()
+        results = {}
+        for mode in ('wsgi', 'asgi'):
+            handler = ASGIHandler(wsgi, workers=options['workers'])
+            self.lock = threading.Lock()
+            self.in_flight = self.max_in_flight = 0
+            tracemalloc.start()
+            started = time.perf_counter()
+            if mode == 'wsgi':
+                rows = self.run_wsgi(handler, options)
+            else:
+                rows = self.run_asgi(handler, options)
+            elapsed = time.perf_counter() - started
+            _, peak_memory = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            handler.executor.shutdown(wait=True)
+            latencies = [seconds * 1000 for _, seconds in rows]
+            summary = {
+                name: round(value, 1)
+                for name, value in summarize(latencies).items()
+            }
+            summary.update(
+                errors=sum(1 for status, _ in rows if status >= 500),
+                seconds=round(elapsed, 2),
+                requests_per_second=round(len(rows) / elapsed, 1),
+                max_in_flight=self.max_in_flight,
+                peak_memory_kb=round(peak_memory / 1024),
+            )
+            results[mode] = summary
+            self.stdout.write(
+                '{mode} (модель): {seconds} с, '
+                '{requests_per_second} запросов/с, p95 {p95} мс, '
+                'одновременных соединений {max_in_flight}, '
+                'пик памяти {peak_memory_kb} КБ, ошибок {errors}'.format(
+                    mode=mode, **summary
+                )
+            )
+        if options['output']:
+            results['method'] = (
+                'model: in-process thread pool with time.sleep for WSGI, '
+                'asyncio for ASGI; memory is tracemalloc of one process'
+            )
+            with open(options['output'], 'w') as output:
+                json.dump(results, output, indent=2)
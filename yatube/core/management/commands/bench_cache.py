@@ -0,0 +1,96 @@
+import json
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils.module_loading import import_string
+
+BACKENDS = {
+    'locmem': ('django.core.cache.backends.locmem.LocMemCache', 'bench'),
+    'sqlite': ('core.cache.SQLiteCache', None),
+}
+
+
+def _worker(args):
+    """Нагрузка одного процесса: чтение с досчётом промахов, как у ленты.
+
+    Ключи выбираются с перекосом в сторону «горячих», значения —
+    отрендеренные фрагменты размером около килобайта.
+    """
+    backend, location, keys, operations, batch, seed = args
+    cache = import_string(backend)(location, {
+        'OPTIONS': {'MAX_ENTRIES': keys * 2},
+    })
+    rng = random.Random(seed)
+    value = 'x' * 1024
+    hits = misses = 0
+    started = time.perf_counter()
+    for _ in range(operations // batch):
+        wanted = [
+            f'card:{int(keys * rng.random() ** 2)}' for _ in range(batch)
+        ]
+        found = cache.get_many(wanted)
+        hits += len(found)
+        missing = {key: value for key in wanted if key not in found}
+        misses += len(missing)
+        if missing:
+            cache.set_many(missing)
+        try:
+            cache.incr('version')
+        except ValueError:
+            cache.add('version', 1)
+    return hits, misses, time.perf_counter() - started
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает LocMemCache и общий SQLiteCache при нагрузке '
+        'из нескольких процессов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=4)
+        parser.add_argument('--operations', type=int, default=20000)
+        parser.add_argument('--keys', type=int, default=2000)
+        parser.add_argument('--batch', type=int, default=10)
+        parser.add_argument(
+            '--output', help='Сохранить результаты в JSON-файл.'
+        )
+
+    def handle(self, *args, **options):
+        results = {}
+        with tempfile.TemporaryDirectory() as directory:
+            for name, (backend, location) in BACKENDS.items():
+                location = location or os.path.join(
+                    directory, f'{name}.sqlite3'
+                )
+                jobs = [
+                    (backend, location, options['keys'],
+                     options['operations'], options['batch'], seed)
+                    for seed in range(options['processes'])
+                ]
+                started = time.perf_counter()
+                with multiprocessing.Pool(options['processes']) as pool:
+                    stats = pool.map(_worker, jobs)
+                elapsed = time.perf_counter() - started
+                hits = sum(item[0] for item in stats)
+                misses = sum(item[1] for item in stats)
+                results[name] = {
+                    'processes': options['processes'],
+                    'reads': hits + misses,
+                    'hit_ratio': round(hits / (hits + misses), 4),
+                    'reads_per_second': round((hits + misses) / elapsed),
+                    'seconds': round(elapsed, 3),
+                }
+                self.stdout.write(
+                    '{name:>7}: hit ratio {hit_ratio:.1%}, '
+                    '{reads_per_second} чтений/с, {seconds} с'.format(
+                        name=name, **results[name]
+                    )
+                )
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(results, output, indent=2)
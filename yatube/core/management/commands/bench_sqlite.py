@@ -0,0 +1,141 @@
+import json
+import multiprocessing
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.db import apply_pragmas
+from core.metrics import summarize
+
+SCHEMA = (
+    'CREATE TABLE post (id INTEGER PRIMARY KEY, author_id INTEGER, '
+    'pub_date REAL, text TEXT)',
+    'CREATE INDEX post_pub_date ON post (pub_date)',
+    'CREATE TABLE comment (id INTEGER PRIMARY KEY, post_id INTEGER, '
+    'created REAL, text TEXT)',
+    'CREATE INDEX comment_post ON comment (post_id, created)',
+)
+READ = (
+    'SELECT post.id, post.text, (SELECT COUNT(*) FROM comment '
+    'WHERE comment.post_id = post.id) FROM post '
+    'ORDER BY pub_date DESC LIMIT 10 OFFSET ?'
+)
+
+
+def _connect(path, pragmas):
+    # Те же параметры, что у соединения Django: таймаут по умолчанию 5 с.
+    connection = sqlite3.connect(path, timeout=5, isolation_level=None)
+    apply_pragmas(connection, pragmas)
+    return connection
+
+
+def _worker(args):
+    """Читатель открывает ленту, писатель добавляет комментарии."""
+    role, path, pragmas, seconds, posts, seed = args
+    connection = _connect(path, pragmas)
+    rng = random.Random(seed)
+    latencies = []
+    errors = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            if role == 'read':
+                connection.execute(
+                    READ, (rng.randrange(0, posts - 10),)
+                ).fetchall()
+            else:
+                connection.execute('BEGIN IMMEDIATE')
+                connection.execute(
+                    'INSERT INTO comment (post_id, created, text) '
+                    'VALUES (?, ?, ?)',
+                    (rng.randrange(1, posts), time.time(), 'x' * 200),
+                )
+                connection.execute('COMMIT')
+        except sqlite3.OperationalError:
+            errors += 1
+            if connection.in_transaction:
+                connection.execute('ROLLBACK')
+            continue
+        latencies.append((time.perf_counter() - started) * 1000)
+    connection.close()
+    return role, latencies, errors
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает одновременные чтение и запись в SQLite с настройками '
+        'по умолчанию и с settings.SQLITE_PRAGMAS.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=4)
+        parser.add_argument('--writers', type=int, default=2)
+        parser.add_argument('--seconds', type=float, default=5)
+        parser.add_argument('--posts', type=int, default=20000)
+        parser.add_argument(
+            '--output', help='Сохранить результаты в JSON-файл.'
+        )
+
+    def prepare(self, path, posts):
+        connection = sqlite3.connect(path)
+        for statement in SCHEMA:
+            connection.execute(statement)
+        connection.executemany(
+            'INSERT INTO post (author_id, pub_date, text) VALUES (?, ?, ?)',
+            ((number % 100, number, 'x' * 500) for number in range(posts)),
+        )
+        connection.commit()
+        connection.close()
+
+    def handle(self, *args, **options):
+        modes = {
+            'default': {'journal_mode': 'delete'},
+            'tuned': getattr(settings, 'SQLITE_PRAGMAS', {}),
+        }
+        results = {}
+        with tempfile.TemporaryDirectory() as directory:
+            for mode, pragmas in modes.items():
+                path = os.path.join(directory, f'{mode}.sqlite3')
+                self.prepare(path, options['posts'])
+                jobs = [
+                    (role, path, pragmas, options['seconds'],
+                     options['posts'], seed)
+                    for seed, role in enumerate(
+                        ['read'] * options['readers']
+                        + ['write'] * options['writers']
+                    )
+                ]
+                with multiprocessing.Pool(len(jobs)) as pool:
+                    stats = pool.map(_worker, jobs)
+                results[mode] = {}
+                for role in ('read', 'write'):
+                    latencies = [
+                        value for name, rows, _ in stats if name == role
+                        for value in rows
+                    ]
+                    summary = {
+                        name: round(value, 3)
+                        for name, value in summarize(latencies).items()
+                    }
+                    summary['per_second'] = round(
+                        len(latencies) / options['seconds'], 1
+                    )
+                    summary['errors'] = sum(
+                        errors for name, _, errors in stats if name == role
+                    )
+                    results[mode][role] = summary
+                    self.stdout.write(
+                        '{mode:>8} {role:<5}: {per_second} оп/с, '
+                        'p95 {p95} мс, p99 {p99} мс, ошибок {errors}'.format(
+                            mode=mode, role=role, **summary
+                        )
+                    )
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(results, output, indent=2)
@@ -0,0 +1,91 @@
+import json
+import random
+import re
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+
+from core.metrics import summarize
+from core.templates import precompile, template_settings
+from posts.management.commands.bench_feeds import Command as FeedsCommand
+
+FEEDS = ('index', 'group_list', 'profile', 'follow_index')
+SERVER_TIMING = re.compile(r'(tpl|total);dur=([\d.]+)')
+
+
+class Command(BaseCommand):
+    help = (
+        'Время отрисовки шаблонов на страницах лент с обычными '
+        'загрузчиками и с кэширующим загрузчиком после предкомпиляции. '
+        'Кэш страниц очищается перед каждым запросом, чтобы шаблоны '
+        'действительно отрисовывались.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=100)
+        parser.add_argument('--warmup', type=int, default=5)
+        parser.add_argument('--pages', type=int, default=5)
+        parser.add_argument(
+            '--views', nargs='+', choices=FEEDS, default=list(FEEDS),
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--output', help='Сохранить результаты в JSON-файл.'
+        )
+
+    def measure(self, target, options):
+        timings = {'tpl': [], 'total': []}
+        for number in range(options['warmup'] + options['requests']):
+            request = target()
+            if request is None:
+                return None
+            client, url = request
+            cache.clear()
+            response = client.get(url)
+            if response.status_code != 200:
+                raise CommandError(f'{url}: код ответа {response.status_code}')
+            if number < options['warmup']:
+                continue
+            for name, value in SERVER_TIMING.findall(
+                response['Server-Timing']
+            ):
+                timings[name].append(float(value))
+        template = summarize(timings['tpl'])
+        return {
+            'template_p50': round(template['p50'], 3),
+            'template_p95': round(template['p95'], 3),
+            'template_mean': round(template['mean'], 3),
+            'total_mean': round(summarize(timings['total'])['mean'], 3),
+        }
+
+    def handle(self, *args, **options):
+        if '*' not in settings.ALLOWED_HOSTS:
+            settings.ALLOWED_HOSTS = [*settings.ALLOWED_HOSTS, 'testserver']
+        results = {}
+        for mode, cached in (('filesystem', False), ('cached', True)):
+            with override_settings(TEMPLATES=template_settings(cached)):
+                if cached:
+                    precompile()
+                rng = random.Random(options['seed'])
+                targets = FeedsCommand().targets(rng, options['pages'])
+                for name in options['views']:
+                    row = self.measure(targets[name], options)
+                    if row is None:
+                        continue
+                    results.setdefault(name, {})[mode] = row
+        self.stdout.write(
+            f'{"view":<14}{"без кэша, мс":>14}{"с кэшем, мс":>14}'
+            f'{"изменение":>12}'
+        )
+        for name, modes in results.items():
+            before = modes['filesystem']['template_mean']
+            after = modes['cached']['template_mean']
+            change = (after - before) / before * 100 if before else 0
+            self.stdout.write(
+                f'{name:<14}{before:>14.2f}{after:>14.2f}{change:>+11.1f}%'
+            )
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(results, output, indent=2)
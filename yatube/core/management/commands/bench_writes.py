@@ -0,0 +1,116 @@
+import json
+import random
+import threading
+import time
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, close_old_connections, connection
+
+from core.metrics import summarize
+from posts.models import Comment, Follow, Post, User
+
+PREFIX = 'bench_writer_'
+
+
+def _operations(user, others, post_ids, rng):
+    """Смесь записей, как у post_create, add_comment и profile_follow."""
+    def create_post():
+        post = Post.objects.create(author=user, text='Пост под нагрузкой')
+        post_ids.append(post.pk)
+
+    def comment():
+        Comment.objects.create(
+            post_id=rng.choice(post_ids), author=user, text='Комментарий'
+        )
+
+    def follow():
+        author = rng.choice(others)
+        deleted, _ = Follow.objects.filter(user=user, author=author).delete()
+        if not deleted:
+            Follow.objects.create(user=user, author=author)
+
+    return (create_post, comment, comment, follow)
+
+
+class Command(BaseCommand):
+    help = (
+        'Параллельные записи из нескольких потоков: посты, комментарии и '
+        'подписки. Сравнивает пропускную способность и число ошибок '
+        'блокировки на текущей базе (см. DATABASE_URL).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--operations', type=int, default=200)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--output', help='Сохранить результаты в JSON-файл.'
+        )
+
+    def worker(self, user, others, post_ids, seed, results):
+        rng = random.Random(seed)
+        operations = _operations(user, others, post_ids, rng)
+        latencies = []
+        errors = 0
+        try:
+            for _ in range(self.operations):
+                started = time.perf_counter()
+                try:
+                    rng.choice(operations)()
+                except DatabaseError:
+                    errors += 1
+                    continue
+                latencies.append((time.perf_counter() - started) * 1000)
+        finally:
+            connection.close()
+        results.append((latencies, errors))
+
+    def handle(self, *args, **options):
+        self.operations = options['operations']
+        password = make_password(None)
+        users = [
+            User.objects.get_or_create(
+                username=f'{PREFIX}{number}',
+                defaults={'password': password},
+            )[0]
+            for number in range(options['threads'])
+        ]
+        post_ids = [
+            Post.objects.create(author=user, text='Стартовый пост').pk
+            for user in users
+        ]
+        close_old_connections()
+        results = []
+        threads = [
+            threading.Thread(target=self.worker, args=(
+                user, [other for other in users if other != user] or [user],
+                post_ids, options['seed'] + number, results,
+            ))
+            for number, user in enumerate(users)
+        ]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        User.objects.filter(username__startswith=PREFIX).delete()
+        latencies = [value for rows, _ in results for value in rows]
+        summary = {
+            name: round(value, 3)
+            for name, value in summarize(latencies).items()
+        }
+        summary.update(
+            vendor=connection.vendor,
+            threads=options['threads'],
+            errors=sum(errors for _, errors in results),
+            writes_per_second=round(len(latencies) / elapsed, 1),
+        )
+        self.stdout.write(
+            '{vendor}: {writes_per_second} записей/с, p95 {p95} мс, '
+            'p99 {p99} мс, ошибок {errors}'.format(**summary)
+        )
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(summary, output, indent=2)
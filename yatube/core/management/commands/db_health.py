@@ -0,0 +1,53 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from core.db import read_pragmas
+
+REPORTED = ('page_size', 'page_count', 'freelist_count', 'wal_autocheckpoint')
+
+
+def _normalize(value):
+    return str(value).lower()
+
+
+class Command(BaseCommand):
+    help = (
+        'Показывает состояние базы: для SQLite — действующие PRAGMA '
+        'в сравнении с settings.SQLITE_PRAGMAS.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--integrity', action='store_true',
+            help='Дополнительно выполнить PRAGMA quick_check.',
+        )
+
+    def handle(self, *args, **options):
+        connection.ensure_connection()
+        self.stdout.write(f'СУБД: {connection.vendor}')
+        if connection.vendor != 'sqlite':
+            return
+        self.stdout.write(f'Файл: {connection.settings_dict["NAME"]}')
+        raw = connection.connection
+        expected = getattr(settings, 'SQLITE_PRAGMAS', {})
+        mismatched = []
+        for name, value in read_pragmas(raw, expected).items():
+            wanted = expected[name]
+            status = 'ok'
+            if _normalize(value) != _normalize(wanted):
+                status = f'ожидалось {wanted}'
+                mismatched.append(name)
+            self.stdout.write(f'  {name} = {value} ({status})')
+        for name, value in read_pragmas(raw, REPORTED).items():
+            self.stdout.write(f'  {name} = {value}')
+        if options['integrity']:
+            result = raw.execute('PRAGMA quick_check').fetchone()[0]
+            self.stdout.write(f'  quick_check = {result}')
+            if result != 'ok':
+                mismatched.append('quick_check')
+        if mismatched:
+            raise CommandError(
+                'Настройки SQLite не применены: ' + ', '.join(mismatched)
+            )
+        self.stdout.write(self.style.SUCCESS('База в порядке'))
@@ -0,0 +1,76 @@
+import logging
+import threading
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, close_old_connections, connection
+
+from core.tasks import run_pending
+
+logger = logging.getLogger('core.tasks')
+
+
+class Command(BaseCommand):
+    help = (
+        'Воркер фоновой очереди: выполняет задачи из таблицы core_task '
+        'с повторами и экспоненциальной паузой между попытками.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency', type=int,
+            default=getattr(settings, 'TASK_WORKERS', 2),
+            help='Сколько задач выполнять параллельно.',
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Выполнить готовые задачи и выйти.',
+        )
+        parser.add_argument(
+            '--sleep', type=float, default=1,
+            help='Пауза между опросами пустой очереди, секунд.',
+        )
+
+    def loop(self, stop, once, sleep, totals):
+        try:
+            while not stop.is_set():
+                close_old_connections()
+                try:
+                    done = run_pending(limit=100)
+                except DatabaseError:
+                    # Например, база занята другим процессом: повторим позже.
+                    logger.exception('Воркер не смог забрать задачи')
+                    done = 0
+                totals.append(done)
+                if not done:
+                    if once:
+                        break
+                    stop.wait(sleep)
+        finally:
+            connection.close()
+
+    def handle(self, *args, **options):
+        stop = threading.Event()
+        totals = []
+        threads = [
+            threading.Thread(
+                target=self.loop,
+                args=(stop, options['once'], options['sleep'], totals),
+                name=f'worker-{number}',
+            )
+            for number in range(max(1, options['concurrency']))
+        ]
+        for thread in threads:
+            thread.start()
+        try:
+            for thread in threads:
+                while thread.is_alive():
+                    thread.join(timeout=0.5)
+        except KeyboardInterrupt:
+            self.stdout.write('Остановка: дожидаемся текущих задач…')
+            stop.set()
+            for thread in threads:
+                thread.join()
+        self.stdout.write(self.style.SUCCESS(
+            f'Выполнено задач: {sum(totals)}'
+        ))
@@ -0,0 +1,44 @@
+from django.conf import settings
+from django.core.checks import ERROR, WARNING
+from django.core.management.base import BaseCommand
+
+from core.checks import TAG
+
+LEVELS = {'WARNING': WARNING, 'ERROR': ERROR}
+
+
+class Command(BaseCommand):
+    help = (
+        'Проверка перед запуском: показывает ключевые настройки и находит '
+        'те, что вредят производительности (DEBUG, некэшированные шаблоны, '
+        'соединения без CONN_MAX_AGE, локальный кэш и т. п.).'
+    )
+    requires_system_checks = False
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--fail-level', choices=sorted(LEVELS), default='WARNING',
+            help='С какого уровня находок завершаться с ошибкой.',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(f'Настройки: {settings.SETTINGS_MODULE}')
+        self.stdout.write(f'  DEBUG = {settings.DEBUG}')
+        self.stdout.write(
+            f'  TEMPLATE_CACHE = {getattr(settings, "TEMPLATE_CACHE", None)}'
+        )
+        for alias, database in settings.DATABASES.items():
+            self.stdout.write(
+                f'  {alias}: {database["ENGINE"]}, '
+                f'CONN_MAX_AGE = {database.get("CONN_MAX_AGE")}'
+            )
+        self.stdout.write(
+            f'  CACHES = {settings.CACHES["default"]["BACKEND"]}'
+        )
+        self.stdout.write(f'  SESSION_ENGINE = {settings.SESSION_ENGINE}')
+        self.check(
+            tags=[TAG],
+            include_deployment_checks=True,
+            display_num_errors=True,
+            fail_level=LEVELS[options['fail_level']],
+        )
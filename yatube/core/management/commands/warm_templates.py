@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+from django.template import engines
+
+from core.templates import is_cached, precompile
+
+
+class Command(BaseCommand):
+    help = (
+        'Разбирает все шаблоны проекта, как при старте в боевом режиме, '
+        'и показывает время разбора самых тяжёлых из них.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--top', type=int, default=10,
+            help='Сколько самых медленных шаблонов показать.',
+        )
+
+    def handle(self, *args, **options):
+        engine = engines['django'].engine
+        if not is_cached(engine):
+            self.stdout.write(self.style.WARNING(
+                'Кэш шаблонов выключен (TEMPLATE_CACHE): в этом режиме '
+                'шаблоны разбираются заново при каждом рендере.'
+            ))
+        timings = precompile()
+        timings.sort(key=lambda row: row[1], reverse=True)
+        for name, seconds in timings[:options['top']]:
+            self.stdout.write(f'{seconds * 1000:>9.2f} мс  {name}')
+        total = sum(seconds for _, seconds in timings)
+        self.stdout.write(self.style.SUCCESS(
+            f'Разобрано шаблонов: {len(timings)} за {total * 1000:.1f} мс'
+        ))
@@ -0,0 +1,192 @@
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.http import FileResponse, HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+
+BYTE_RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+SENDFILE_HEADERS = {
+    'x-sendfile': 'X-Sendfile',
+    'x-accel-redirect': 'X-Accel-Redirect',
+}
+# Заранее сжатые копии файла в порядке предпочтения.
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+class FileRange:
+    """Часть открытого файла: чтение не выходит за конец диапазона.
+
+    fileno() и tell() остаются от исходного файла, поэтому сервер
+    с wsgi.file_wrapper на os.sendfile (gunicorn) отправит ровно
+    Content-Length байт с текущей позиции, не копируя их в Python.
+    """
+
+    def __init__(self, file, start, length):
+        file.seek(start)
+        self.file = file
+        self.name = file.name
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def tell(self):
+        return self.file.tell()
+
+    def close(self):
+        self.file.close()
+
+
+def etag(stat):
+    """ETag из времени изменения и размера, как у nginx."""
+    return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+
+def parse_range(header, size):
+    """Первый и последний байт из заголовка Range или None.
+
+    Поддерживается один диапазон; для нескольких, как и для заголовков
+    с ошибкой, отдаётся файл целиком.
+    """
+    match = BYTE_RANGE.match(header.strip())
+    if match is None:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        length = int(last)
+        if not length:
+            raise RangeNotSatisfiable
+        return max(0, size - length), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise RangeNotSatisfiable
+    return start, end
+
+
+def if_range_matches(request, tag, modified):
+    value = request.META.get('HTTP_IF_RANGE')
+    if not value:
+        return True
+    if value.startswith(('"', 'W/')):
+        return value == tag
+    return parse_http_date_safe(value) == int(modified)
+
+
+def accepted_encodings(header):
+    accepted = set()
+    for item in header.split(','):
+        coding, _, params = item.strip().partition(';')
+        if params.replace(' ', '') not in ('q=0', 'q=0.0', 'q=0.00'):
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+def negotiate(request, path, stat):
+    """Сжатая копия файла, которую примет клиент, или сам файл.
+
+    Возвращает кодировку (None — без сжатия), путь и stat отдаваемого файла.
+    """
+    accepted = accepted_encodings(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+    for encoding, suffix in ENCODINGS:
+        if encoding in accepted:
+            try:
+                return encoding, path + suffix, os.stat(path + suffix)
+            except OSError:
+                continue
+    return None, path, stat
+
+
+def serve(request, path, name, stat, cache_control=None, encoding=None,
+          sendfile=''):
+    """Ответ с файлом name (путь от корня раздачи), лежащим по пути path.
+
+    С sendfile ('x-sendfile' или 'x-accel-redirect') тело отдаёт
+    фронтенд-сервер по заголовку, иначе — FileResponse с поддержкой
+    Range. Условные запросы получают 304 в обоих случаях.
+    encoding — кодировка сжатой копии из negotiate().
+    """
+    tag = etag(stat)
+    headers = {
+        'ETag': tag,
+        'Last-Modified': http_date(stat.st_mtime),
+        'Cache-Control': cache_control or 'max-age={}'.format(
+            getattr(settings, 'MEDIA_CACHE_SECONDS', 0)
+        ),
+        'Accept-Ranges': 'bytes',
+    }
+    response = get_conditional_response(
+        request, etag=tag, last_modified=int(stat.st_mtime)
+    )
+    if response is None:
+        content_type, _ = mimetypes.guess_type(name)
+        content_type = content_type or 'application/octet-stream'
+        if sendfile:
+            response = sendfile_response(
+                path, name + dict(ENCODINGS).get(encoding, ''),
+                content_type, sendfile,
+            )
+        else:
+            response = file_response(request, path, stat, tag, content_type)
+        if encoding:
+            response['Content-Encoding'] = encoding
+    for header, value in headers.items():
+        response[header] = value
+    return response
+
+
+def sendfile_response(path, name, content_type, backend):
+    if backend not in SENDFILE_HEADERS:
+        raise ImproperlyConfigured(
+            f'Неизвестный MEDIA_SENDFILE: {backend!r}'
+        )
+    response = HttpResponse(content_type=content_type)
+    if backend == 'x-accel-redirect':
+        prefix = getattr(settings, 'MEDIA_ACCEL_PREFIX', '/protected-media/')
+        response['X-Accel-Redirect'] = prefix + quote(name)
+    else:
+        response['X-Sendfile'] = path
+    return response
+
+
+def file_response(request, path, stat, tag, content_type):
+    size = stat.st_size
+    try:
+        byte_range = None
+        if 'HTTP_RANGE' in request.META and if_range_matches(
+            request, tag, stat.st_mtime
+        ):
+            byte_range = parse_range(request.META['HTTP_RANGE'], size)
+    except RangeNotSatisfiable:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+    file = open(path, 'rb')
+    if byte_range is None:
+        return FileResponse(file, content_type=content_type)
+    start, end = byte_range
+    response = FileResponse(
+        FileRange(file, start, end - start + 1), content_type=content_type
+    )
+    response.status_code = 206
+    response['Content-Length'] = end - start + 1
+    response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    return response
@@ -0,0 +1,21 @@
+import math
+
+
+def percentile(values, rank):
+    """Перцентиль rank (0–100) по методу ближайшего ранга."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, math.ceil(rank / 100 * len(ordered)) - 1)
+    return ordered[index]
+
+
+def summarize(values):
+    """Сводка задержек: количество, среднее и p50/p95/p99."""
+    return {
+        'count': len(values),
+        'mean': sum(values) / len(values) if values else 0.0,
+        'p50': percentile(values, 50),
+        'p95': percentile(values, 95),
+        'p99': percentile(values, 99),
+    }
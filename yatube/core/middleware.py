@@ -0,0 +1,220 @@
+import heapq
+import logging
+import os
+import sys
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.template.backends.django import Template
+
+from .metrics import summarize
+from .routers import pin_to_primary
+
+logger = logging.getLogger('core.slow_requests')
+
+_local = threading.local()
+_original_render = Template.render
+
+
+def _timed_render(self, context=None, request=None):
+    """Template.render, который учитывает время отрисовки в метриках.
+
+    Вложенные шаблоны ({% include %}) рендерятся внутри родительского,
+    поэтому считается только внешний вызов.
+    """
+    metrics = getattr(_local, 'metrics', None)
+    if metrics is None or metrics.rendering:
+        return _original_render(self, context, request)
+    metrics.rendering = True
+    started = time.perf_counter()
+    try:
+        return _original_render(self, context, request)
+    finally:
+        metrics.template_time += time.perf_counter() - started
+        metrics.rendering = False
+
+
+def instrument_templates():
+    """Подменяет Template.render один раз на процесс (из CoreConfig.ready)."""
+    if Template.render is not _timed_render:
+        Template.render = _timed_render
+
+
+def _call_site():
+    """Первый кадр стека из кода проекта, породивший запрос к базе."""
+    root = settings.BASE_DIR + os.sep
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(root) and filename != __file__:
+            return '{}:{} in {}'.format(
+                os.path.relpath(filename, root), frame.f_lineno,
+                frame.f_code.co_name,
+            )
+        frame = frame.f_back
+    return ''
+
+
+def _shows_timing(request):
+    # Время SQL и число запросов — не для посторонних глаз.
+    if settings.DEBUG:
+        return True
+    user = getattr(request, 'user', None)
+    return user is not None and user.is_staff
+
+
+class RequestMetrics:
+    """Замеры одного запроса: время SQL, шаблонов и самые медленные SQL."""
+
+    def __init__(self, top):
+        self.top = top
+        self.queries = 0
+        self.sql_time = 0.0
+        self.template_time = 0.0
+        self.rendering = False
+        self.slowest = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            self.queries += 1
+            self.sql_time += duration
+            self._remember(duration, sql)
+
+    def _remember(self, duration, sql):
+        # Место вызова ищется по стеку, только если запрос попадает в топ.
+        if not self.top:
+            return
+        if len(self.slowest) < self.top:
+            heapq.heappush(
+                self.slowest, (duration, self.queries, sql, _call_site())
+            )
+        elif duration > self.slowest[0][0]:
+            heapq.heapreplace(
+                self.slowest, (duration, self.queries, sql, _call_site())
+            )
+
+    def slow_queries(self):
+        return [
+            {'ms': round(duration * 1000, 3), 'sql': sql[:1000], 'site': site}
+            for duration, _, sql, site in sorted(self.slowest, reverse=True)
+        ]
+
+
+class ViewStats:
+    """Последние замеры по каждому view в памяти процесса."""
+
+    def __init__(self, size):
+        self.size = size
+        self._lock = threading.Lock()
+        self._samples = defaultdict(lambda: deque(maxlen=self.size))
+
+    def record(self, view, total, sql, queries, template):
+        with self._lock:
+            self._samples[view].append((total, sql, queries, template))
+
+    def clear(self):
+        with self._lock:
+            self._samples.clear()
+
+    def summary(self):
+        with self._lock:
+            samples = {
+                view: list(rows) for view, rows in self._samples.items()
+            }
+        result = {}
+        for view, rows in sorted(samples.items()):
+            total, sql, queries, template = zip(*rows)
+            result[view] = {
+                **{name: round(value, 3)
+                   for name, value in summarize(total).items()},
+                'sql_ms': round(sum(sql) / len(sql), 3),
+                'queries': round(sum(queries) / len(queries), 2),
+                'template_ms': round(sum(template) / len(template), 3),
+            }
+        return result
+
+
+stats = ViewStats(getattr(settings, 'REQUEST_METRICS_SAMPLES', 1000))
+
+
+class RequestMetricsMiddleware:
+    """Замеряет каждый запрос: общее время, шаблоны и SQL.
+
+    Итог пишется в статистику по view и (при DEBUG или для персонала)
+    в заголовок Server-Timing, а запросы дольше SLOW_REQUEST_MS —
+    строкой JSON в лог core.slow_requests вместе с самыми медленными
+    SQL и местом их вызова.
+    Ставится первым в MIDDLEWARE, чтобы учитывать остальные слои.
+    Время шаблонов считается, если включён REQUEST_METRICS_TEMPLATES.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.threshold = getattr(settings, 'SLOW_REQUEST_MS', 500)
+        self.top = getattr(settings, 'SLOW_REQUEST_QUERIES', 5)
+
+    def __call__(self, request):
+        metrics = RequestMetrics(self.top)
+        _local.metrics = metrics
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for alias in connections:
+                    stack.enter_context(
+                        connections[alias].execute_wrapper(metrics)
+                    )
+                response = self.get_response(request)
+        finally:
+            _local.metrics = None
+        total = (time.perf_counter() - started) * 1000
+        sql = metrics.sql_time * 1000
+        template = metrics.template_time * 1000
+        match = request.resolver_match
+        view = match.view_name if match else 'unresolved'
+        stats.record(view, total, sql, metrics.queries, template)
+        if _shows_timing(request):
+            response['Server-Timing'] = (
+                f'sql;dur={sql:.1f};desc="{metrics.queries} queries", '
+                f'tpl;dur={template:.1f}, total;dur={total:.1f}'
+            )
+        if total >= self.threshold:
+            logger.warning({
+                'method': request.method,
+                'path': request.get_full_path(),
+                'view': view,
+                'status': response.status_code,
+                'total_ms': round(total, 3),
+                'template_ms': round(template, 3),
+                'sql_ms': round(sql, 3),
+                'queries': metrics.queries,
+                'slow_queries': metrics.slow_queries(),
+            })
+        return response
+
+
+class PrimaryStickinessMiddleware:
+    """После успешной записи закрепляет клиента за основной базой.
+
+    Пока действует cookie (REPLICA_STICKY_SECONDS), read_from_replica
+    читает из default, и автор сразу видит свой пост, комментарий или
+    подписку, даже если реплика ещё не догнала основную базу.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if (getattr(settings, 'DATABASE_REPLICAS', ())
+                and request.method not in ('GET', 'HEAD', 'OPTIONS')
+                and response.status_code < 400):
+            pin_to_primary(response)
+        return response
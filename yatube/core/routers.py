@@ -0,0 +1,108 @@
+import itertools
+import threading
+import time
+from collections import Counter
+from functools import wraps
+
+from django.conf import settings
+
+STICKY_COOKIE = 'primary_until'
+
+_local = threading.local()
+
+
+class ReplicaPool:
+    """Выбирает реплику для запроса и считает занятые соединения.
+
+    Стратегии: round_robin — по кругу, least_loaded — реплика
+    с наименьшим числом выполняющихся сейчас запросов процесса.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._active = Counter()
+        self._turn = itertools.count()
+
+    def acquire(self, replicas, strategy):
+        with self._lock:
+            if strategy == 'least_loaded':
+                alias = min(replicas, key=lambda name: self._active[name])
+            else:
+                alias = replicas[next(self._turn) % len(replicas)]
+            self._active[alias] += 1
+            return alias
+
+    def release(self, alias):
+        with self._lock:
+            self._active[alias] -= 1
+
+
+pool = ReplicaPool()
+
+
+def current_replica():
+    return getattr(_local, 'alias', None)
+
+
+def is_pinned(request):
+    """Недавно писавший клиент читает с основной базы."""
+    try:
+        until = float(request.COOKIES.get(STICKY_COOKIE, 0))
+    except ValueError:
+        return False
+    return until > time.time()
+
+
+def pin_to_primary(response):
+    seconds = getattr(settings, 'REPLICA_STICKY_SECONDS', 5)
+    response.set_cookie(
+        STICKY_COOKIE, f'{time.time() + seconds:.3f}',
+        max_age=seconds, httponly=True, samesite='Lax',
+    )
+
+
+def read_from_replica(view):
+    """Выполняет чтения view на одной из реплик DATABASE_REPLICAS.
+
+    Реплика выбирается один раз на запрос, чтобы страница собиралась
+    из одного снимка данных. Запросы, кроме GET и HEAD, и клиенты,
+    закреплённые за основной базой после записи, идут в default.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        replicas = getattr(settings, 'DATABASE_REPLICAS', ())
+        if (not replicas or request.method not in ('GET', 'HEAD')
+                or is_pinned(request) or current_replica() is not None):
+            return view(request, *args, **kwargs)
+        alias = pool.acquire(
+            list(replicas), getattr(settings, 'REPLICA_STRATEGY', '')
+        )
+        _local.alias = alias
+        try:
+            return view(request, *args, **kwargs)
+        finally:
+            _local.alias = None
+            pool.release(alias)
+    return wrapper
+
+
+class ReplicaRouter:
+    """Отправляет чтения внутри read_from_replica на выбранную реплику.
+
+    Вне таких view и для всех записей решение остаётся за default.
+    """
+
+    def db_for_read(self, model, **hints):
+        return current_replica()
+
+    def db_for_write(self, model, **hints):
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {'default', *getattr(settings, 'DATABASE_REPLICAS', ())}
+        if {obj1._state.db, obj2._state.db} <= databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return None
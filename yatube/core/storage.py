@@ -0,0 +1,78 @@
+import gzip
+
+from django.contrib.staticfiles.storage import (
+    ManifestStaticFilesStorage, staticfiles_storage,
+)
+from django.core.files.base import ContentFile
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE = (
+    '.css', '.js', '.map', '.json', '.svg', '.txt', '.html', '.xml',
+    '.ico', '.ttf', '.otf', '.eot',
+)
+MIN_SIZE = 256
+IMMUTABLE = 'public, max-age=31536000, immutable'
+
+
+def compressors():
+    """Расширение и функция сжатия; brotli — если пакет установлен."""
+    result = [('gz', lambda data: gzip.compress(data, 9, mtime=0))]
+    if brotli is not None:
+        result.append(('br', brotli.compress))
+    return result
+
+
+def is_immutable(name):
+    """Имя с хэшем содержимого из манифеста никогда не меняет содержимое."""
+    hashed_files = getattr(staticfiles_storage, 'hashed_files', {})
+    return name in hashed_files.values()
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Статика с хэшем содержимого в имени и заранее сжатыми копиями.
+
+    collectstatic кладёт рядом с каждым текстовым файлом name.gz
+    и name.br (если установлен brotli), чтобы ни фронтенд-сервер,
+    ни core.views.static_file не сжимали их на каждом запросе.
+    Файлы, которых нет в манифесте, отдаются под исходным именем,
+    а не ломают страницу ошибкой.
+    """
+
+    manifest_strict = False
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            # Файла нет и среди собранных: ссылка останется без хэша.
+            return name
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        names = set(paths) | set(self.hashed_files.values())
+        for name in sorted(names):
+            if name.endswith(COMPRESSIBLE):
+                for compressed in self.compress(name):
+                    yield name, compressed, True
+
+    def compress(self, name):
+        with self.open(name) as file:
+            data = file.read()
+        if len(data) < MIN_SIZE:
+            return
+        for extension, function in compressors():
+            compressed = function(data)
+            # Почти не сжавшийся файл выгоднее отдавать как есть.
+            if len(compressed) > len(data) * 0.95:
+                continue
+            target = f'{name}.{extension}'
+            if self.exists(target):
+                self.delete(target)
+            self.save(target, ContentFile(compressed))
+            yield target
@@ -0,0 +1,145 @@
+import json
+import logging
+import random
+import traceback
+from datetime import timedelta
+from importlib import import_module
+
+from django.conf import settings
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Task
+
+logger = logging.getLogger(__name__)
+
+registry = {}
+
+
+class TaskFunction:
+    """Функция, которую можно выполнить сейчас или поставить в очередь."""
+
+    def __init__(self, function, max_attempts=None):
+        self.function = function
+        self.name = f'{function.__module__}.{function.__name__}'
+        self.max_attempts = max_attempts
+        self.__doc__ = function.__doc__
+        registry[self.name] = self
+
+    def __call__(self, *args, **kwargs):
+        return self.function(*args, **kwargs)
+
+    def delay(self, *args, **kwargs):
+        """Ставит вызов в очередь в текущей транзакции.
+
+        Задача появится у воркера только после коммита, вместе с данными,
+        которые она обрабатывает. В режиме TASKS_EAGER она выполняется
+        сразу в этом же процессе — для тестов и локальной разработки.
+        """
+        if getattr(settings, 'TASKS_EAGER', False):
+            self(*args, **kwargs)
+            return None
+        return Task.objects.create(
+            name=self.name,
+            payload=json.dumps({'args': args, 'kwargs': kwargs}),
+            max_attempts=self.max_attempts or getattr(
+                settings, 'TASK_MAX_ATTEMPTS', 5
+            ),
+        )
+
+
+def task(function=None, *, max_attempts=None):
+    """Регистрирует функцию как фоновую задачу: @task или @task(...)."""
+    if function is None:
+        return lambda function: TaskFunction(function, max_attempts)
+    return TaskFunction(function, max_attempts)
+
+
+def resolve(name):
+    if name not in registry:
+        module, _, _ = name.rpartition('.')
+        try:
+            import_module(module)
+        except ImportError:
+            pass
+    return registry.get(name)
+
+
+def backoff(attempts):
+    """Пауза перед повтором: экспонента от TASK_BACKOFF с разбросом."""
+    base = getattr(settings, 'TASK_BACKOFF', 10)
+    ceiling = getattr(settings, 'TASK_BACKOFF_MAX', 3600)
+    delay = min(ceiling, base * 2 ** (attempts - 1))
+    return timedelta(seconds=delay * random.uniform(0.5, 1.5))
+
+
+def _available(now):
+    # Задачи упавшего воркера освобождаются, когда истекает аренда.
+    return (Q(status=Task.PENDING, run_at__lte=now)
+            | Q(status=Task.RUNNING, locked_until__lt=now))
+
+
+def claim():
+    """Забирает одну готовую задачу или возвращает None.
+
+    Захват — условный UPDATE, поэтому несколько воркеров не получат
+    одну задачу и без SELECT … FOR UPDATE, которого нет в SQLite.
+    """
+    now = timezone.now()
+    lease = timedelta(seconds=getattr(settings, 'TASK_LEASE', 300))
+    candidates = Task.objects.filter(_available(now)).order_by(
+        'run_at'
+    ).values_list('pk', flat=True)[:10]
+    for pk in candidates:
+        claimed = Task.objects.filter(_available(now), pk=pk).update(
+            status=Task.RUNNING,
+            locked_until=now + lease,
+            attempts=F('attempts') + 1,
+        )
+        if claimed:
+            return Task.objects.get(pk=pk)
+    return None
+
+
+def execute(task_row):
+    """Выполняет захваченную задачу; при ошибке планирует повтор."""
+    function = resolve(task_row.name)
+    try:
+        if function is None:
+            raise LookupError(f'Задача {task_row.name} не зарегистрирована')
+        payload = json.loads(task_row.payload)
+        function(*payload.get('args', ()), **payload.get('kwargs', {}))
+    except Exception:
+        error = traceback.format_exc()
+        retry = function is not None and (
+            task_row.attempts < task_row.max_attempts
+        )
+        logger.warning(
+            'Задача %s #%s упала (попытка %s)',
+            task_row.name, task_row.pk, task_row.attempts,
+        )
+        # attempts — маркер захвата: если аренда истекла и задачу забрал
+        # другой воркер, запись уже не наша.
+        Task.objects.filter(
+            pk=task_row.pk, attempts=task_row.attempts
+        ).update(
+            status=Task.PENDING if retry else Task.FAILED,
+            run_at=timezone.now() + backoff(task_row.attempts),
+            locked_until=None,
+            last_error=error,
+        )
+        return False
+    Task.objects.filter(pk=task_row.pk, attempts=task_row.attempts).delete()
+    return True
+
+
+def run_pending(limit=None):
+    """Выполняет готовые задачи, пока они есть; возвращает их число."""
+    done = 0
+    while limit is None or done < limit:
+        task_row = claim()
+        if task_row is None:
+            break
+        execute(task_row)
+        done += 1
+    return done
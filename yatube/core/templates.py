@@ -0,0 +1,73 @@
+import copy
+import os
+import time
+
+from django.conf import settings
+from django.template import engines
+from django.template.loaders.cached import Loader as CachedLoader
+
+LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+EXTENSIONS = ('.html', '.txt')
+
+
+def template_loaders(cached):
+    """Загрузчики шаблонов, обёрнутые в кэширующий при cached."""
+    if cached:
+        return [('django.template.loaders.cached.Loader', list(LOADERS))]
+    return list(LOADERS)
+
+
+def template_settings(cached):
+    """Копия settings.TEMPLATES с кэширующим или обычными загрузчиками."""
+    templates = copy.deepcopy(settings.TEMPLATES)
+    for backend in templates:
+        backend['APP_DIRS'] = False
+        backend.setdefault('OPTIONS', {})['loaders'] = template_loaders(
+            cached
+        )
+    return templates
+
+
+def is_cached(engine):
+    return any(
+        isinstance(loader, CachedLoader) for loader in engine.template_loaders
+    )
+
+
+def template_names(directories):
+    """Имена всех шаблонов в каталогах, как их передают в render()."""
+    for directory in directories:
+        for root, dirs, files in os.walk(directory):
+            dirs.sort()
+            for filename in sorted(files):
+                if filename.endswith(EXTENSIONS):
+                    path = os.path.relpath(
+                        os.path.join(root, filename), directory
+                    )
+                    yield path.replace(os.sep, '/')
+
+
+def precompile(using='django'):
+    """Разбирает все шаблоны из DIRS движка и возвращает время разбора.
+
+    С кэширующим загрузчиком разобранные шаблоны остаются в его кэше,
+    и первые запросы к процессу уже не читают файлы с диска.
+    Ошибка синтаксиса в шаблоне прерывает запуск, а не всплывает
+    на случайной странице.
+    """
+    engine = engines[using].engine
+    timings = []
+    for name in template_names(engine.dirs):
+        started = time.perf_counter()
+        engine.get_template(name)
+        timings.append((name, time.perf_counter() - started))
+    return timings
+
+
+def warm_up():
+    """Предкомпиляция шаблонов при старте процесса (wsgi.py, asgi.py)."""
+    if getattr(settings, 'TEMPLATE_PRECOMPILE', False):
+        precompile()
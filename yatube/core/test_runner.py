@@ -0,0 +1,43 @@
+import copy
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+FILE_BACKENDS = (
+    'core.cache.SQLiteCache',
+    'django.core.cache.backends.filebased.FileBasedCache',
+)
+
+
+def temporary_caches(directory):
+    """CACHES, где файловые кэши перенесены в каталог directory."""
+    caches = copy.deepcopy(settings.CACHES)
+    for alias, params in caches.items():
+        if params['BACKEND'] in FILE_BACKENDS:
+            params['LOCATION'] = os.path.join(directory, alias)
+    return caches
+
+
+class TestRunner(DiscoverRunner):
+    """Запускает тесты с файлами кэша во временном каталоге.
+
+    Тесты вызывают cache.clear(), и с LOCATION из настроек они стирали
+    бы кэш рабочего сайта.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._cache_dir = tempfile.mkdtemp()
+        self._caches_override = override_settings(
+            CACHES=temporary_caches(self._cache_dir)
+        )
+        self._caches_override.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self._caches_override.disable()
+        shutil.rmtree(self._cache_dir, ignore_errors=True)
+        super().teardown_test_environment(**kwargs)
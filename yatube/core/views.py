@@ -1,4 +1,18 @@
+import os
+import stat
+
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.core.exceptions import PermissionDenied, SuspiciousFileOperation
+from django.http import Http404, JsonResponse
 from django.shortcuts import render
+from django.utils._os import safe_join
+from django.utils.cache import patch_vary_headers
+from django.views.decorators.http import require_safe
+
+from . import media as media_files
+from . import middleware
+from .storage import IMMUTABLE, is_immutable
 
 
 def page_not_found(request, exception):
@@ -15,3 +29,73 @@ def permission_denied(request, exception):
 
 def csrf_failure(request, reason=''):
     return render(request, 'core/403csrf.html')
+
+
+@staff_member_required
+def request_metrics(request):
+    """Перцентили задержек и SQL по каждому view текущего процесса."""
+    if request.method == 'POST':
+        middleware.stats.clear()
+    return JsonResponse({
+        'pid': os.getpid(),
+        'views': middleware.stats.summary(),
+    })
+
+
+def _stat_file(root, path):
+    try:
+        full_path = safe_join(root, path)
+        file_stat = os.stat(full_path)
+    except (SuspiciousFileOperation, OSError):
+        raise Http404
+    if not stat.S_ISREG(file_stat.st_mode):
+        raise Http404
+    return full_path, file_stat
+
+
+@require_safe
+def media(request, path):
+    """Файл из MEDIA_ROOT; пути из MEDIA_PROTECTED_PATHS — после входа.
+
+    Защищённые файлы помечаются private, чтобы их не сохранили общие
+    кэши между браузером и сервером.
+    """
+    protected = path.startswith(
+        tuple(getattr(settings, 'MEDIA_PROTECTED_PATHS', ()))
+    )
+    if protected and not request.user.is_authenticated:
+        raise PermissionDenied
+    full_path, file_stat = _stat_file(settings.MEDIA_ROOT, path)
+    cache_control = None
+    if protected:
+        cache_control = 'private, max-age={}'.format(
+            getattr(settings, 'MEDIA_CACHE_SECONDS', 0)
+        )
+    return media_files.serve(
+        request, full_path, path, file_stat, cache_control=cache_control,
+        sendfile=getattr(settings, 'MEDIA_SENDFILE', ''),
+    )
+
+
+@require_safe
+def static_file(request, path):
+    """Собранная статика из STATIC_ROOT, если её не отдал фронтенд-сервер.
+
+    Клиент получает сжатую копию, если принимает её, а файлы с хэшем
+    содержимого в имени кэшируются навсегда.
+    """
+    full_path, file_stat = _stat_file(settings.STATIC_ROOT, path)
+    encoding, full_path, file_stat = media_files.negotiate(
+        request, full_path, file_stat
+    )
+    cache_control = IMMUTABLE if is_immutable(path) else (
+        'public, max-age={}'.format(
+            getattr(settings, 'STATIC_CACHE_SECONDS', 0)
+        )
+    )
+    response = media_files.serve(
+        request, full_path, path, file_stat,
+        cache_control=cache_control, encoding=encoding,
+    )
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
@@ -0,0 +1,65 @@
+from django.conf import settings
+from django.db import connections, router
+from django.db.models import (
+    Count, F, RowRange, Window, prefetch_related_objects,
+)
+from django.db.models.functions import RowNumber
+
+from .models import Comment
+
+
+class WholePartition(RowRange):
+    """Рамка окна ROWS BETWEEN UNBOUNDED PRECEDING AND UNBOUNDED FOLLOWING.
+
+    Django 2.2 запрещает рамки на SQLite, хотя сами оконные функции
+    (SQLite 3.25+) с ними работают.
+    """
+
+    def window_frame_start_end(self, connection, start, end):
+        return 'UNBOUNDED PRECEDING', 'UNBOUNDED FOLLOWING'
+
+
+def attach_comment_activity(posts, limit=None):
+    """Добавляет постам число комментариев и последние комментарии.
+
+    Независимо от размера страницы выполняет ровно два запроса:
+    выборку комментариев с оконными ROW_NUMBER/COUNT по посту и
+    подгрузку их авторов. Оба окна идут по возрастанию (post, created),
+    как индекс comment_post_created_idx, поэтому SQLite не сортирует
+    комментарии во временном B-дереве; последние отбираются условием
+    position > total - limit.
+    """
+    posts = list(posts)
+    if limit is None:
+        limit = settings.LATEST_COMMENTS
+    for post in posts:
+        post.comments_count = 0
+        post.latest_comments = []
+    if not posts:
+        return posts
+    by_id = {post.pk: post for post in posts}
+    order = [F('created').asc(), F('pk').asc()]
+    ranked = Comment.objects.filter(post_id__in=by_id).annotate(
+        position=Window(
+            RowNumber(), partition_by=[F('post_id')], order_by=order,
+        ),
+        total=Window(
+            Count('pk'), partition_by=[F('post_id')], order_by=order,
+            frame=WholePartition(),
+        ),
+    ).order_by()
+    sql, params = ranked.query.sql_with_params()
+    alias = router.db_for_read(Comment)
+    quote = connections[alias].ops.quote_name
+    comments = list(Comment.objects.db_manager(alias).raw(
+        f'SELECT * FROM ({sql}) AS ranked '
+        f'WHERE ranked.{quote("position")} > ranked.{quote("total")} - %s',
+        (*params, limit),
+    ))
+    comments.sort(key=lambda comment: -comment.position)
+    prefetch_related_objects(comments, 'author')
+    for comment in comments:
+        post = by_id[comment.post_id]
+        post.comments_count = comment.total
+        post.latest_comments.append(comment)
+    return posts
@@ -0,0 +1,121 @@
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.db.models import Count, Max
+from django.middleware.csrf import get_token
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+
+from . import fragments, page_cache
+from .models import Post
+
+
+def _csrf_cookie(request):
+    # Формы авторизованного пользователя несут CSRF-токен, который
+    # меняется при входе: копия со старым токеном не должна получить 304.
+    if not request.user.is_authenticated:
+        return ''
+    get_token(request)
+    return request.META['CSRF_COOKIE']
+
+
+def _etag(request, *parts):
+    """Слабый ETag: страница зависит ещё и от того, кто её смотрит.
+
+    CONDITIONAL_GET_SALT меняют при выкладке новых шаблонов.
+    """
+    source = ':'.join(str(part) for part in (
+        getattr(settings, 'CONDITIONAL_GET_SALT', ''),
+        request.user.pk,
+        _csrf_cookie(request),
+        *parts,
+    ))
+    return 'W/"{}"'.format(hashlib.md5(source.encode()).hexdigest())
+
+
+def _cached(request, compute, *args, **kwargs):
+    # condition() вызывает функции ETag и Last-Modified по отдельности,
+    # а считать состояние страницы нужно один раз.
+    if not hasattr(request, '_page_state'):
+        request._page_state = compute(*args, **kwargs)
+    return request._page_state
+
+
+def conditional(etag_func, last_modified_func):
+    """condition() с обязательной перепроверкой сохранённой копии.
+
+    Без no-cache браузер по эвристике от Last-Modified показывал бы
+    старую ленту, не спрашивая сервер.
+    """
+    def decorator(view):
+        validated = condition(etag_func, last_modified_func)(view)
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            response = validated(request, *args, **kwargs)
+            if request.method in ('GET', 'HEAD'):
+                patch_cache_control(
+                    response, no_cache=True,
+                    private=request.user.is_authenticated,
+                )
+            return response
+        return wrapper
+    return decorator
+
+
+def conditional_feed(get_scopes, get_posts):
+    """Ответ 304 для ленты, если с прошлого визита в ней ничего не менялось.
+
+    Состояние ленты — время последнего поста и поколения областей
+    page_cache, которые сдвигаются при любом изменении, включая правку,
+    удаление и готовые миниатюры. Это один агрегатный запрос по индексу
+    и одно чтение кэша вместо рендера страницы.
+    """
+    def state(**kwargs):
+        feed = get_posts(**kwargs).aggregate(latest=Max('pub_date'))
+        feed['generations'] = page_cache.generations(get_scopes(**kwargs))
+        return feed
+
+    def etag(request, **kwargs):
+        feed = _cached(request, state, **kwargs)
+        if feed['latest'] is None:
+            return None
+        return _etag(
+            request, feed['latest'].isoformat(), feed['generations']
+        )
+
+    def last_modified(request, **kwargs):
+        return _cached(request, state, **kwargs)['latest']
+
+    return conditional(etag, last_modified)
+
+
+def _post_state(post_id):
+    # Без first(): её ORDER BY по pk заставил бы SQLite сортировать группы.
+    posts = Post.objects.filter(pk=post_id).select_related('author').annotate(
+        last_comment=Max('comments__created'),
+        comment_count=Count('comments'),
+    ).only('pub_date', 'group', 'author__username').order_by()
+    return next(iter(posts), None)
+
+
+def _post_etag(request, post_id):
+    post = _cached(request, _post_state, post_id)
+    if post is None:
+        return None
+    return _etag(
+        request, post.pk, post.comment_count, post.last_comment,
+        fragments.dependency_versions(post),
+        page_cache.generations((f'profile:{post.author.username}',)),
+    )
+
+
+def _post_last_modified(request, post_id):
+    post = _cached(request, _post_state, post_id)
+    if post is None:
+        return None
+    return max(filter(None, (post.pub_date, post.last_comment)))
+
+
+conditional_post = conditional(_post_etag, _post_last_modified)
@@ -0,0 +1,79 @@
+from django.db import transaction
+from django.db.models import Count, F
+from django.db.models.functions import Greatest
+
+from .models import Follow, Post, User, UserStats
+
+FIELDS = ('posts_count', 'followers_count', 'following_count')
+
+
+def _count_by(queryset, field):
+    return dict(
+        queryset.values_list(field).annotate(total=Count('pk')).order_by()
+    )
+
+
+def compute(user_id):
+    """Считает счётчики пользователя по исходным таблицам."""
+    return {
+        'posts_count': Post.objects.filter(author_id=user_id).count(),
+        'followers_count': Follow.objects.filter(author_id=user_id).count(),
+        'following_count': Follow.objects.filter(user_id=user_id).count(),
+    }
+
+
+def adjust(user_id, **deltas):
+    """Сдвигает счётчики пользователя на заданные величины.
+
+    Если строки статистики ещё нет, она создаётся сразу с точными
+    значениями, которые уже учитывают текущее изменение. При уменьшении
+    строка не создаётся: так каскадное удаление пользователя не
+    воскрешает его статистику.
+    """
+    with transaction.atomic():
+        updated = UserStats.objects.filter(user_id=user_id).update(**{
+            field: Greatest(F(field) + delta, 0)
+            for field, delta in deltas.items()
+        })
+        if not updated and any(delta > 0 for delta in deltas.values()):
+            UserStats.objects.get_or_create(
+                user_id=user_id, defaults=compute(user_id)
+            )
+
+
+def stats_for(user):
+    """Возвращает строку статистики, создавая её при первом обращении."""
+    stats, _ = UserStats.objects.get_or_create(
+        user=user, defaults=compute(user.pk)
+    )
+    return stats
+
+
+@transaction.atomic
+def reconcile():
+    """Сверяет счётчики со всеми таблицами и чинит расхождения.
+
+    Возвращает количество исправленных или созданных строк.
+    """
+    actual = {
+        'posts_count': _count_by(Post.objects.all(), 'author'),
+        'followers_count': _count_by(Follow.objects.all(), 'author'),
+        'following_count': _count_by(Follow.objects.all(), 'user'),
+    }
+    existing = UserStats.objects.in_bulk()
+    to_create = []
+    to_update = []
+    for user_id in User.objects.values_list('pk', flat=True).iterator():
+        values = {
+            field: actual[field].get(user_id, 0) for field in FIELDS
+        }
+        stats = existing.get(user_id)
+        if stats is None:
+            to_create.append(UserStats(user_id=user_id, **values))
+        elif any(getattr(stats, f) != v for f, v in values.items()):
+            for field, value in values.items():
+                setattr(stats, field, value)
+            to_update.append(stats)
+    UserStats.objects.bulk_create(to_create, batch_size=500)
+    UserStats.objects.bulk_update(to_update, FIELDS, batch_size=500)
+    return len(to_create) + len(to_update)
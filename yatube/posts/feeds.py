@@ -0,0 +1,63 @@
+from itertools import islice
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import FeedEntry, Follow, Post
+
+
+def _bulk_insert(entries):
+    """Вставляет записи ленты пачками, не держа в памяти весь список."""
+    batch_size = getattr(settings, 'FEED_BATCH_SIZE', 1000)
+    entries = iter(entries)
+    while True:
+        batch = list(islice(entries, batch_size))
+        if not batch:
+            break
+        FeedEntry.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+def push_post(post):
+    """Раскладывает новый пост во входящие ленты подписчиков автора."""
+    followers = Follow.objects.filter(
+        author_id=post.author_id
+    ).values_list('user_id', flat=True)
+    _bulk_insert(
+        FeedEntry(user_id=user_id, post=post, pub_date=post.pub_date)
+        for user_id in followers.iterator()
+    )
+
+
+def backfill(user_id, author_id):
+    """Добавляет в ленту подписчика уже опубликованные посты автора."""
+    posts = Post.objects.filter(
+        author_id=author_id
+    ).values_list('id', 'pub_date')
+    _bulk_insert(
+        FeedEntry(user_id=user_id, post_id=post_id, pub_date=pub_date)
+        for post_id, pub_date in posts.iterator()
+    )
+
+
+def prune(user_id, author_id):
+    """Убирает из ленты подписчика посты автора после отписки."""
+    FeedEntry.objects.filter(
+        user_id=user_id,
+        post__author_id=author_id,
+    ).delete()
+
+
+def feed_for(user):
+    """Лента подписок: чтение по индексу (user, -pub_date)."""
+    return FeedEntry.objects.filter(user=user).select_related(
+        'post__author', 'post__group'
+    )
+
+
+@transaction.atomic
+def rebuild_feeds():
+    """Пересобирает все входящие ленты с нуля по таблице подписок."""
+    FeedEntry.objects.all().delete()
+    follows = Follow.objects.values_list('user_id', 'author_id')
+    for user_id, author_id in follows.iterator():
+        backfill(user_id, author_id)
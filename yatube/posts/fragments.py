@@ -0,0 +1,151 @@
+import threading
+import time
+
+from django.core.cache import cache
+from django.db.models import prefetch_related_objects
+from django.template.loader import render_to_string
+
+from .comments import attach_comment_activity
+
+CARD_TEMPLATE = 'includes/list_posts.html'
+CARD_KEY = 'post_card:{post}:{flag}:{versions}'
+VERSION_KEY = 'post_card_version:{kind}:{pk}'
+HITS_KEY = 'post_card_stats:hits'
+MISSES_KEY = 'post_card_stats:misses'
+CARD_TIMEOUT = 60 * 60 * 24
+STATS_FLUSH_SECONDS = 30
+
+# Счётчики процесса: запись в общий кэш берёт его блокировку записи,
+# поэтому они сбрасываются туда не чаще раза в STATS_FLUSH_SECONDS.
+_pending = {HITS_KEY: 0, MISSES_KEY: 0}
+_pending_lock = threading.Lock()
+_flushed_at = time.monotonic()
+
+
+def _new_version():
+    return int(time.time() * 1000)
+
+
+def version_key(kind, pk):
+    return VERSION_KEY.format(kind=kind, pk=pk)
+
+
+def bump_version(kind, pk):
+    """Инвалидирует карточки, зависящие от поста, группы или автора."""
+    key = version_key(kind, pk)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, _new_version(), None)
+
+
+def _incr_counter(key, delta):
+    if not delta:
+        return
+    try:
+        cache.incr(key, delta)
+    except ValueError:
+        cache.add(key, 0, None)
+        cache.incr(key, delta)
+
+
+def _count(hits, misses):
+    with _pending_lock:
+        _pending[HITS_KEY] += hits
+        _pending[MISSES_KEY] += misses
+        due = time.monotonic() - _flushed_at >= STATS_FLUSH_SECONDS
+    if due:
+        flush_stats()
+
+
+def flush_stats():
+    """Переносит накопленные процессом счётчики карточек в кэш."""
+    global _flushed_at
+    with _pending_lock:
+        counts = dict(_pending)
+        for key in _pending:
+            _pending[key] = 0
+        _flushed_at = time.monotonic()
+    for key, delta in counts.items():
+        _incr_counter(key, delta)
+
+
+def _dependencies(post):
+    return (
+        version_key('post', post.pk),
+        version_key('group', post.group_id),
+        version_key('user', post.author_id),
+    )
+
+
+def _load_versions(posts):
+    keys = {key for post in posts for key in _dependencies(post)}
+    versions = cache.get_many(keys)
+    missing = {key: _new_version() for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, None)
+        versions.update(missing)
+    return versions
+
+
+def dependency_versions(post):
+    """Версии поста, его группы и автора одной строкой."""
+    versions = _load_versions([post])
+    return '.'.join(str(versions[key]) for key in _dependencies(post))
+
+
+def render_cards(posts, flag_group_link):
+    """Собирает карточки постов из кэша, дорендеривая промахи.
+
+    Ключ карточки содержит версии поста, группы и автора, поэтому
+    изменение любого из них делает старый фрагмент недостижимым.
+    """
+    posts = list(posts)
+    if not posts:
+        return []
+    versions = _load_versions(posts)
+    keys = [
+        CARD_KEY.format(
+            post=post.pk,
+            flag=int(bool(flag_group_link)),
+            versions='.'.join(
+                str(versions[key]) for key in _dependencies(post)
+            ),
+        )
+        for post in posts
+    ]
+    cached = cache.get_many(keys)
+    # Комментарии и варианты картинок нужны только карточкам, которых
+    # нет в кэше: готовый фрагмент их уже содержит.
+    missed = [post for key, post in zip(keys, posts) if key not in cached]
+    attach_comment_activity(missed)
+    prefetch_related_objects(
+        [post for post in missed if post.image], 'image_variants',
+    )
+    rendered = {}
+    cards = []
+    for key, post in zip(keys, posts):
+        if key not in cached:
+            rendered[key] = render_to_string(
+                CARD_TEMPLATE,
+                {'post': post, 'flag_group_link': flag_group_link},
+            )
+        cards.append(cached[key] if key in cached else rendered[key])
+    if rendered:
+        cache.set_many(rendered, CARD_TIMEOUT)
+    _count(len(cached), len(rendered))
+    return cards
+
+
+def stats():
+    """Счётчики попаданий и промахов кэша карточек."""
+    flush_stats()
+    counters = cache.get_many((HITS_KEY, MISSES_KEY))
+    hits = counters.get(HITS_KEY, 0)
+    misses = counters.get(MISSES_KEY, 0)
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': hits / total if total else 0.0,
+    }
@@ -0,0 +1,179 @@
+import json
+import random
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.metrics import summarize
+from posts.models import Follow, Group, Post, User
+
+VIEWS = ('index', 'group_list', 'profile', 'post_detail', 'follow_index')
+SAMPLE_SIZE = 50
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагрузочный прогон лент: задержки p50/p95/p99, запросы к базе '
+        'на страницу и пропускная способность по каждому view.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--warmup', type=int, default=10)
+        parser.add_argument(
+            '--pages', type=int, default=20,
+            help='Из скольких первых страниц выбирать номер страницы.',
+        )
+        parser.add_argument(
+            '--views', nargs='+', choices=VIEWS, default=list(VIEWS),
+        )
+        parser.add_argument(
+            '--cold', action='store_true',
+            help='Очищать кэш перед каждым запросом.',
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--output', help='Сохранить результаты в JSON-файл.'
+        )
+        parser.add_argument(
+            '--compare', help='JSON прошлого прогона для сравнения.'
+        )
+
+    def targets(self, rng, pages):
+        """Генераторы адресов и клиентов для каждого view.
+
+        Авторы и группы берутся из самых наполненных, чтобы страницы
+        не оказывались пустыми.
+        """
+        authors = list(User.objects.annotate(
+            total=Count('posts')
+        ).filter(total__gt=0).order_by('-total').values_list(
+            'username', flat=True
+        )[:SAMPLE_SIZE])
+        groups = list(Group.objects.annotate(
+            total=Count('posts')
+        ).filter(total__gt=0).order_by('-total').values_list(
+            'slug', flat=True
+        )[:SAMPLE_SIZE])
+        post_ids = list(Post.objects.order_by('-pub_date').values_list(
+            'pk', flat=True
+        )[:SAMPLE_SIZE * pages])
+        readers = list(User.objects.filter(
+            pk__in=Follow.objects.values('user')
+        ).order_by('?')[:SAMPLE_SIZE])
+        if not post_ids:
+            raise CommandError(
+                'Нет постов: сначала запустите generate_bench_data.'
+            )
+        anonymous = Client()
+        followers = []
+        for reader in readers:
+            client = Client()
+            client.force_login(reader)
+            followers.append(client)
+
+        def page():
+            return f'?page={rng.randint(1, pages)}'
+
+        return {
+            'index': lambda: (anonymous, reverse('posts:index') + page()),
+            'group_list': lambda: (anonymous, reverse(
+                'posts:group_list', args=(rng.choice(groups),)
+            ) + page()) if groups else None,
+            'profile': lambda: (anonymous, reverse(
+                'posts:profile', args=(rng.choice(authors),)
+            ) + page()) if authors else None,
+            'post_detail': lambda: (anonymous, reverse(
+                'posts:post_detail', args=(rng.choice(post_ids),)
+            )),
+            'follow_index': lambda: (
+                rng.choice(followers), reverse('posts:follow_index') + page()
+            ) if followers else None,
+        }
+
+    def measure(self, target, requests, warmup, cold):
+        latencies = []
+        queries = []
+        for number in range(warmup + requests):
+            request = target()
+            if request is None:
+                return None
+            client, url = request
+            if cold:
+                cache.clear()
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                response = client.get(url)
+                elapsed = time.perf_counter() - started
+            if response.status_code != 200:
+                raise CommandError(f'{url}: код ответа {response.status_code}')
+            if number >= warmup:
+                latencies.append(elapsed * 1000)
+                queries.append(len(captured))
+        summary = {name: round(value, 3)
+                   for name, value in summarize(latencies).items()}
+        summary['queries'] = round(sum(queries) / len(queries), 2)
+        summary['max_queries'] = max(queries)
+        summary['rps'] = round(1000 / summary['mean'], 1)
+        return summary
+
+    def report(self, results, baseline):
+        header = (
+            f'{"view":<14}{"p50, мс":>10}{"p95, мс":>10}{"p99, мс":>10}'
+            f'{"запросов":>10}{"rps":>9}'
+        )
+        self.stdout.write(header)
+        for name, row in results.items():
+            line = (
+                f'{name:<14}{row["p50"]:>10.2f}{row["p95"]:>10.2f}'
+                f'{row["p99"]:>10.2f}{row["queries"]:>10.2f}'
+                f'{row["rps"]:>9.1f}'
+            )
+            old = baseline.get(name)
+            if old:
+                change = (row['p95'] - old['p95']) / old['p95'] * 100
+                line += (
+                    f'   p95 {change:+.1f}%, '
+                    f'запросов {row["queries"] - old["queries"]:+.2f}'
+                )
+            self.stdout.write(line)
+
+    def handle(self, *args, **options):
+        baseline = {}
+        if options['compare']:
+            with open(options['compare']) as source:
+                baseline = json.load(source)['views']
+        rng = random.Random(options['seed'])
+        # Test Client требует разрешённого хоста testserver.
+        if '*' not in settings.ALLOWED_HOSTS:
+            settings.ALLOWED_HOSTS = [*settings.ALLOWED_HOSTS, 'testserver']
+        targets = self.targets(rng, options['pages'])
+        results = {}
+        for name in options['views']:
+            summary = self.measure(
+                targets[name], options['requests'], options['warmup'],
+                options['cold'],
+            )
+            if summary is None:
+                self.stdout.write(f'{name}: нет данных, пропущено')
+                continue
+            results[name] = summary
+        self.report(results, baseline)
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump({
+                    'settings': {
+                        'requests': options['requests'],
+                        'cold': options['cold'],
+                        'count_post': settings.COUNT_POST,
+                    },
+                    'posts': Post.objects.count(),
+                    'views': results,
+                }, output, indent=2)
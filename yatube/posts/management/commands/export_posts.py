@@ -0,0 +1,36 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from posts.transfer import FORMATS, RowWriter, export_rows, guess_format
+
+
+class Command(BaseCommand):
+    help = (
+        'Выгружает посты в JSON Lines или CSV. Таблица читается через '
+        'iterator(), поэтому расход памяти не зависит от её размера.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', nargs='?', default='-', help="Файл или '-' для stdout.",
+        )
+        parser.add_argument('--format', choices=FORMATS)
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or guess_format(path)
+        stream = sys.stdout if path == '-' else open(
+            path, 'w', newline='', encoding='utf-8'
+        )
+        exported = 0
+        try:
+            writer = RowWriter(stream, fmt)
+            for row in export_rows(options['chunk_size']):
+                writer.write(row)
+                exported += 1
+        finally:
+            if stream is not sys.stdout:
+                stream.close()
+        self.stderr.write(f'Выгружено постов: {exported}')
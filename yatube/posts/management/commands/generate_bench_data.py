@@ -0,0 +1,178 @@
+import random
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from faker import Faker
+
+from posts.models import Comment, Follow, Group, Post, User
+from posts.transfer import explicit_dates
+
+TEXT_POOL_SIZE = 2000
+
+
+def power_law_weights(size, alpha):
+    """Веса популярности по закону Ципфа: ранг r получает 1 / r**alpha."""
+    return [1 / rank ** alpha for rank in range(1, size + 1)]
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет базу синтетическими данными для нагрузочных тестов: '
+        'пользователи, группы, посты, граф подписок со степенным '
+        'распределением и комментарии.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100000)
+        parser.add_argument('--groups', type=int, default=200)
+        parser.add_argument('--posts', type=int, default=1000000)
+        parser.add_argument('--comments', type=int, default=2000000)
+        parser.add_argument(
+            '--follows', type=float, default=20,
+            help='Среднее число подписок на пользователя.',
+        )
+        parser.add_argument(
+            '--alpha', type=float, default=1.1,
+            help='Показатель степенного закона популярности авторов.',
+        )
+        parser.add_argument('--days', type=int, default=365)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def log(self, message):
+        self.stdout.write(message)
+        self.stdout.flush()
+
+    def bulk(self, model, objects, batch_size, ignore_conflicts=False):
+        batch = []
+        total = 0
+        for obj in objects:
+            batch.append(obj)
+            if len(batch) >= batch_size:
+                model.objects.bulk_create(
+                    batch, ignore_conflicts=ignore_conflicts
+                )
+                total += len(batch)
+                batch = []
+        if batch:
+            model.objects.bulk_create(batch, ignore_conflicts=ignore_conflicts)
+            total += len(batch)
+        return total
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        fake = Faker('ru_RU')
+        fake.seed_instance(options['seed'])
+        batch_size = options['batch_size']
+        now = timezone.now()
+        span = timedelta(days=options['days']).total_seconds()
+        texts = [fake.paragraph(nb_sentences=5)
+                 for _ in range(TEXT_POOL_SIZE)]
+
+        def moment():
+            return now - timedelta(seconds=rng.random() * span)
+
+        password = make_password(None)
+        first_user = User.objects.order_by('-pk').values_list(
+            'pk', flat=True
+        ).first() or 0
+        created = self.bulk(User, (
+            User(
+                username=f'bench_{first_user + number}',
+                first_name=fake.first_name(),
+                last_name=fake.last_name(),
+                password=password,
+            )
+            for number in range(options['users'])
+        ), batch_size)
+        self.log(f'Пользователей: {created}')
+        user_ids = list(User.objects.filter(
+            username__startswith='bench_'
+        ).values_list('pk', flat=True))
+        rng.shuffle(user_ids)
+        weights = power_law_weights(len(user_ids), options['alpha'])
+
+        created = self.bulk(Group, (
+            Group(
+                title=fake.catch_phrase()[:200],
+                slug=f'bench-{first_user}-{number}',
+                description=fake.sentence(),
+            )
+            for number in range(options['groups'])
+        ), batch_size)
+        self.log(f'Групп: {created}')
+        group_ids = list(Group.objects.filter(
+            slug__startswith=f'bench-{first_user}-'
+        ).values_list('pk', flat=True)) or [None]
+
+        def authors(count):
+            while count > 0:
+                size = min(count, batch_size)
+                yield from rng.choices(user_ids, weights, k=size)
+                count -= size
+
+        with explicit_dates(Post._meta.get_field('pub_date')), \
+                transaction.atomic():
+            created = self.bulk(Post, (
+                Post(
+                    author_id=author_id,
+                    group_id=rng.choice(group_ids + [None]),
+                    text=rng.choice(texts),
+                    pub_date=moment(),
+                )
+                for author_id in authors(options['posts'])
+            ), batch_size)
+        self.log(f'Постов: {created}')
+
+        def follows():
+            limit = max(1, len(user_ids) - 1)
+            for user_id in user_ids:
+                count = min(limit, int(rng.expovariate(
+                    1 / options['follows']
+                )))
+                seen = set()
+                for author_id in rng.choices(user_ids, weights, k=count):
+                    if author_id != user_id and author_id not in seen:
+                        seen.add(author_id)
+                        yield Follow(user_id=user_id, author_id=author_id)
+
+        # Пользователи прошлых запусков тоже участвуют в графе, и пара
+        # может уже быть подписана.
+        existing = Follow.objects.count()
+        with transaction.atomic():
+            self.bulk(Follow, follows(), batch_size, ignore_conflicts=True)
+        self.log(f'Подписок: {Follow.objects.count() - existing}')
+
+        post_ids = []
+        if options['comments']:
+            post_ids = list(Post.objects.values_list('pk', flat=True))
+            rng.shuffle(post_ids)
+        post_weights = power_law_weights(len(post_ids), options['alpha'])
+
+        def commented_posts(count):
+            while post_ids and count > 0:
+                size = min(count, batch_size)
+                yield from rng.choices(post_ids, post_weights, k=size)
+                count -= size
+
+        with explicit_dates(Comment._meta.get_field('created')), \
+                transaction.atomic():
+            created = self.bulk(Comment, (
+                Comment(
+                    post_id=post_id,
+                    author_id=rng.choice(user_ids),
+                    text=rng.choice(texts)[:200],
+                    created=moment(),
+                )
+                for post_id in commented_posts(options['comments'])
+            ), batch_size)
+        self.log(f'Комментариев: {created}')
+
+        self.log('Пересборка производных данных…')
+        call_command('rebuild_feeds', stdout=self.stdout)
+        call_command('reconcile_stats', stdout=self.stdout)
+        call_command('rebuild_search_index', stdout=self.stdout)
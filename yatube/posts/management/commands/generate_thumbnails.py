@@ -0,0 +1,48 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from posts.models import Post
+from posts.thumbnails import generate
+
+
+def _generate(post_id):
+    close_old_connections()
+    try:
+        return post_id, generate(post_id), None
+    except Exception as error:
+        return post_id, None, error
+    finally:
+        close_old_connections()
+
+
+class Command(BaseCommand):
+    help = 'Строит миниатюры для уже загруженных картинок постов.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=4,
+            help='Количество параллельных потоков.',
+        )
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Перестроить миниатюры и у постов, где они уже есть.',
+        )
+
+    def handle(self, *args, **options):
+        posts = Post.objects.exclude(image='')
+        if not options['all']:
+            posts = posts.filter(image_thumbnail='')
+        post_ids = list(posts.values_list('pk', flat=True))
+        done = failed = 0
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            for post_id, _, error in executor.map(_generate, post_ids):
+                if error is None:
+                    done += 1
+                else:
+                    failed += 1
+                    self.stderr.write(f'Пост {post_id}: {error}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Миниатюр построено: {done}, ошибок: {failed}'
+        ))
@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, Sum
+
+from posts.models import Post, PostImageVariant
+
+
+def _human(size):
+    for unit in ('Б', 'КБ', 'МБ', 'ГБ'):
+        if abs(size) < 1024:
+            return f'{size:.1f} {unit}'
+        size /= 1024
+    return f'{size:.1f} ТБ'
+
+
+class Command(BaseCommand):
+    help = 'Сравнивает объём вариантов картинок с исходными файлами.'
+
+    def handle(self, *args, **options):
+        post_ids = set(
+            PostImageVariant.objects.values_list('post', flat=True)
+        )
+        original = 0
+        missing = 0
+        for post in Post.objects.filter(pk__in=post_ids).only('image'):
+            try:
+                original += post.image.size
+            except (OSError, ValueError):
+                missing += 1
+        self.stdout.write(
+            f'Постов с вариантами: {len(post_ids)}, '
+            f'исходники: {_human(original)}'
+        )
+        if missing:
+            self.stdout.write(f'Исходники не найдены: {missing}')
+        rows = PostImageVariant.objects.values('format', 'width').annotate(
+            files=Count('pk'), total=Sum('size')
+        ).order_by('format', 'width')
+        for row in rows:
+            ratio = row['total'] / original if original else 0
+            self.stdout.write(
+                f"{row['format']:>5} {row['width']:>5}w: "
+                f"{row['files']} файлов, {_human(row['total'])} "
+                f'({ratio:.1%} от исходников)'
+            )
@@ -0,0 +1,68 @@
+import sys
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from posts import page_cache
+from posts.models import Post
+from posts.transfer import (
+    FORMATS, PostImporter, batches, explicit_dates, guess_format, read_rows,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Импортирует посты из JSON Lines или CSV пачками через bulk_create. '
+        'Сигналы на каждый пост не вызываются; производные данные '
+        'пересобирает флаг --rebuild.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Файл или '-' для stdin.")
+        parser.add_argument('--format', choices=FORMATS)
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--create-missing', action='store_true',
+            help='Создавать неизвестных авторов и группы.',
+        )
+        parser.add_argument(
+            '--rebuild', action='store_true',
+            help=(
+                'После импорта пересобрать ленты, счётчики, поисковый '
+                'индекс и миниатюры.'
+            ),
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or guess_format(path)
+        importer = PostImporter(create_missing=options['create_missing'])
+        created = 0
+        stream = sys.stdin if path == '-' else open(
+            path, newline='', encoding='utf-8'
+        )
+        try:
+            with explicit_dates(Post._meta.get_field('pub_date')):
+                for rows in batches(
+                    read_rows(stream, fmt), options['batch_size']
+                ):
+                    with transaction.atomic():
+                        posts = Post.objects.bulk_create(importer.build(rows))
+                    created += len(posts)
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+        page_cache.bump(
+            'index',
+            *(f'profile:{name}' for name in importer.touched_authors),
+            *(f'group:{slug}' for slug in importer.touched_groups),
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Импортировано постов: {created}, пропущено: {importer.skipped}'
+        ))
+        if options['rebuild']:
+            call_command('rebuild_feeds', stdout=self.stdout)
+            call_command('reconcile_stats', stdout=self.stdout)
+            call_command('rebuild_search_index', stdout=self.stdout)
+            call_command('generate_thumbnails', stdout=self.stdout)
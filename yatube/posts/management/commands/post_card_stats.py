@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from posts.fragments import stats
+
+
+class Command(BaseCommand):
+    help = 'Показывает попадания и промахи кэша карточек постов.'
+
+    def handle(self, *args, **options):
+        counters = stats()
+        self.stdout.write(
+            'hits: {hits}\nmisses: {misses}\n'
+            'hit ratio: {hit_ratio:.2%}'.format(**counters)
+        )
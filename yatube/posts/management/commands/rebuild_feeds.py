@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from posts.feeds import rebuild_feeds
+from posts.models import FeedEntry
+
+
+class Command(BaseCommand):
+    help = 'Пересобирает входящие ленты подписок с нуля.'
+
+    def handle(self, *args, **options):
+        rebuild_feeds()
+        self.stdout.write(self.style.SUCCESS(
+            f'Лента пересобрана, записей: {FeedEntry.objects.count()}'
+        ))
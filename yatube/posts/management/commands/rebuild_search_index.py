@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from posts.search import get_backend
+
+
+class Command(BaseCommand):
+    help = 'Полностью перестраивает поисковый индекс постов.'
+
+    def handle(self, *args, **options):
+        backend = get_backend()
+        with transaction.atomic(using=backend.alias):
+            backend.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f'Индекс перестроен: {type(backend).__name__}'
+        ))
@@ -49,11 +49,27 @@ class Post(models.Model):
         upload_to='posts/',
         blank=True
     )
+    image_thumbnail = models.CharField(
+        'Миниатюра',
+        max_length=255,
+        blank=True,
+        editable=False,
+    )
 
     class Meta:
         ordering = ('-pub_date',)
         verbose_name = 'Пост'
         verbose_name_plural = 'Посты'
+        indexes = [
+            models.Index(
+                fields=('group', '-pub_date'),
+                name='post_group_pub_date_idx',
+            ),
+            models.Index(
+                fields=('author', '-pub_date'),
+                name='post_author_pub_date_idx',
+            ),
+        ]
 
     def __str__(self):
         return self.text[:self.FIRST_TEXT]
@@ -84,8 +100,15 @@ class Comment(models.Model):
     )
 
     class Meta:
+        ordering = ('created',)
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = [
+            models.Index(
+                fields=('post', 'created'),
+                name='comment_post_created_idx',
+            ),
+        ]
 
 
 class Follow(models.Model):
@@ -109,4 +132,89 @@ class Follow(models.Model):
                 name="prevent_self_follow",
                 check=~models.Q(user=models.F("author")),
             ),
+            models.UniqueConstraint(
+                fields=('user', 'author'),
+                name='unique_follow',
+            ),
+        ]
+
+
+class FeedEntry(models.Model):
+    """Запись во входящей ленте подписчика (fan-out on write)."""
+    user = models.ForeignKey(
+        User,
+        related_name='feed_entries',
+        on_delete=models.CASCADE,
+    )
+    post = models.ForeignKey(
+        Post,
+        related_name='feed_entries',
+        on_delete=models.CASCADE,
+    )
+    pub_date = models.DateTimeField(
+        verbose_name='Дата публикации',
+    )
+
+    class Meta:
+        ordering = ('-pub_date',)
+        verbose_name = 'Запись ленты'
+        verbose_name_plural = 'Записи ленты'
+        constraints = [
+            models.UniqueConstraint(
+                fields=('user', 'post'),
+                name='unique_feed_entry',
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=('user', '-pub_date'),
+                name='feed_user_pub_date_idx',
+            ),
         ]
+
+
+class UserStats(models.Model):
+    """Денормализованные счётчики профиля пользователя."""
+    user = models.OneToOneField(
+        User,
+        primary_key=True,
+        related_name='stats',
+        on_delete=models.CASCADE,
+    )
+    posts_count = models.PositiveIntegerField('Постов', default=0)
+    followers_count = models.PositiveIntegerField('Подписчиков', default=0)
+    following_count = models.PositiveIntegerField('Подписок', default=0)
+
+    class Meta:
+        verbose_name = 'Статистика пользователя'
+        verbose_name_plural = 'Статистика пользователей'
+
+    def __str__(self):
+        return f'{self.user}: {self.posts_count}'
+
+
+class PostImageVariant(models.Model):
+    """Уменьшенная копия картинки поста в одном из форматов."""
+    post = models.ForeignKey(
+        Post,
+        related_name='image_variants',
+        on_delete=models.CASCADE,
+    )
+    width = models.PositiveIntegerField('Ширина')
+    format = models.CharField('Формат', max_length=10)
+    file = models.FileField('Файл', upload_to='posts/variants/')
+    size = models.PositiveIntegerField('Размер, байт')
+
+    class Meta:
+        ordering = ('post', 'format', 'width')
+        verbose_name = 'Вариант картинки'
+        verbose_name_plural = 'Варианты картинок'
+        constraints = [
+            models.UniqueConstraint(
+                fields=('post', 'format', 'width'),
+                name='unique_image_variant',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.post_id}: {self.format} {self.width}w'
@@ -0,0 +1,82 @@
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+
+PAGE_KEY = 'page_cache:{view}:{args}:{page}:{cursor}:{generations}'
+SCOPE_KEY = 'page_cache_scope:{scope}'
+
+
+def _new_generation():
+    return int(time.time() * 1000)
+
+
+def bump(*scopes):
+    """Сбрасывает закэшированные страницы указанных областей.
+
+    Область — это лента, которую затрагивает изменение: 'index',
+    'group:<slug>' или 'profile:<username>'.
+    """
+    for scope in scopes:
+        key = SCOPE_KEY.format(scope=scope)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, _new_generation(), None)
+
+
+def post_scopes(post):
+    """Области лент, в которых показан пост."""
+    scopes = ['index', f'profile:{post.author.username}']
+    if post.group_id:
+        scopes.append(f'group:{post.group.slug}')
+    return scopes
+
+
+def generations(scopes):
+    """Текущие поколения областей одной строкой."""
+    keys = [SCOPE_KEY.format(scope=scope) for scope in scopes]
+    values = cache.get_many(keys)
+    missing = {key: _new_generation() for key in keys
+               if key not in values}
+    if missing:
+        cache.set_many(missing, None)
+        values.update(missing)
+    return '.'.join(str(values[key]) for key in keys)
+
+
+def cache_anonymous_page(get_scopes):
+    """Кэширует ответ view для анонимных пользователей.
+
+    get_scopes(**kwargs) возвращает области, от которых зависит страница;
+    их поколения входят в ключ кэша, поэтому bump() точечно делает
+    старые копии недостижимыми. Заголовок X-Cache показывает HIT или MISS.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if (request.method not in ('GET', 'HEAD')
+                    or request.user.is_authenticated):
+                return view(request, *args, **kwargs)
+            key = PAGE_KEY.format(
+                view=view.__name__,
+                args=':'.join(f'{name}={value}' for name, value in sorted(
+                    kwargs.items()
+                )),
+                page=request.GET.get('page', ''),
+                cursor=request.GET.get('cursor', ''),
+                generations=generations(get_scopes(**kwargs)),
+            )
+            response = cache.get(key)
+            if response is not None:
+                response['X-Cache'] = 'HIT'
+                return response
+            response = view(request, *args, **kwargs)
+            if (response.status_code == 200 and not response.streaming
+                    and not response.cookies):
+                cache.set(key, response, settings.PAGE_CACHE_TIMEOUT)
+            response['X-Cache'] = 'MISS'
+            return response
+        return wrapper
+    return decorator
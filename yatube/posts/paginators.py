@@ -0,0 +1,133 @@
+import base64
+import json
+
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+
+def encode_cursor(moment, pk, reverse=False):
+    """Упаковывает позицию в ленте в непрозрачный токен."""
+    payload = json.dumps(
+        {'d': moment.isoformat(), 'i': pk, 'r': int(reverse)},
+        separators=(',', ':'),
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """Распаковывает токен, для битого токена возвращает None."""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        moment = parse_datetime(payload['d'])
+        pk = int(payload['i'])
+        reverse = bool(payload.get('r'))
+    except (TypeError, ValueError, KeyError, AttributeError):
+        return None
+    if moment is None:
+        return None
+    return moment, pk, reverse
+
+
+class CursorPage:
+    """Страница ленты, выбранная по ключу (pub_date, id) без OFFSET."""
+
+    cursor_mode = True
+    number = None
+
+    def __init__(self, object_list, cursor, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.cursor = cursor
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f'<Cursor page {self.cursor or "first"}>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """Постраничная выборка по ключу (field, id).
+
+    Не выполняет COUNT(*) и не использует OFFSET: каждая страница —
+    это диапазонное чтение по индексу поля сортировки (в SQLite индекс
+    неявно содержит rowid, то есть id записи). По умолчанию лента идёт
+    от новых постов к старым по pub_date.
+    """
+
+    def __init__(self, object_list, per_page, field='pub_date',
+                 descending=True):
+        self.object_list = object_list
+        self.per_page = per_page
+        self.field = field
+        self.descending = descending
+
+    def get_page(self, token):
+        position = decode_cursor(token) if token else None
+        if position is None:
+            return self._page(self._ordered(self.object_list), '', False)
+        value, pk, reverse = position
+        after = 'gt' if self.descending == reverse else 'lt'
+        objects = self.object_list.filter(
+            Q(**{f'{self.field}__{after}': value})
+            | Q(**{self.field: value, f'pk__{after}': pk})
+        )
+        return self._page(self._ordered(objects, reverse), token, reverse)
+
+    def _ordered(self, objects, reverse=False):
+        prefix = '-' if self.descending != reverse else ''
+        return objects.order_by(f'{prefix}{self.field}', f'{prefix}pk')
+
+    def _cursor(self, obj, reverse=False):
+        return encode_cursor(getattr(obj, self.field), obj.pk, reverse)
+
+    def _page(self, objects, token, reverse):
+        rows = list(objects[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if reverse:
+            rows.reverse()
+        if not rows:
+            return CursorPage(rows, token, None, None)
+        next_cursor = previous_cursor = None
+        if has_more or reverse:
+            next_cursor = self._cursor(rows[-1])
+        if token and (has_more or not reverse):
+            previous_cursor = self._cursor(rows[0], reverse=True)
+        return CursorPage(rows, token, next_cursor, previous_cursor)
+
+
+def paginate(request, objects, per_page):
+    """Выбирает движок пагинации по параметрам запроса.
+
+    Ссылки вида ?page=N продолжают обслуживаться обычным Paginator,
+    ?cursor=... — курсорным. Без параметров курсорный движок
+    используется, только если включён settings.CURSOR_PAGINATION.
+    """
+    page_number = request.GET.get('page')
+    cursor = request.GET.get('cursor')
+    if cursor is not None or (
+        page_number is None
+        and getattr(settings, 'CURSOR_PAGINATION', False)
+    ):
+        return CursorPaginator(objects, per_page).get_page(cursor)
+    return Paginator(objects, per_page).get_page(page_number)
@@ -0,0 +1,183 @@
+import re
+
+from django.conf import settings
+from django.db import connections, router
+from django.utils.functional import cached_property
+from django.utils.module_loading import import_string
+
+from .models import Post
+
+FTS_TABLE = 'posts_post_fts'
+TOKEN = re.compile(r'\w+', re.UNICODE)
+
+
+class SearchBackend:
+    """Интерфейс поискового движка по тексту постов.
+
+    Движок хранит собственный индекс и отвечает идентификаторами постов
+    в порядке релевантности; сами посты подгружает SearchResults.
+    """
+
+    def __init__(self, alias):
+        self.alias = alias
+
+    @property
+    def connection(self):
+        return connections[self.alias]
+
+    def index(self, post_id, text):
+        raise NotImplementedError
+
+    def remove(self, post_id):
+        raise NotImplementedError
+
+    def rebuild(self):
+        raise NotImplementedError
+
+    def count(self, query):
+        raise NotImplementedError
+
+    def search(self, query, offset, limit):
+        raise NotImplementedError
+
+
+class SQLiteFTSBackend(SearchBackend):
+    """Инвертированный индекс на виртуальной таблице SQLite FTS5.
+
+    Таблица создаётся миграцией 0015_post_search_index.
+    """
+
+    @staticmethod
+    def match_expression(query):
+        """Превращает ввод пользователя в безопасное выражение MATCH.
+
+        Каждое слово берётся в кавычки и ищется по префиксу, поэтому
+        операторы FTS5 из запроса не интерпретируются.
+        """
+        return ' '.join(f'"{token}"*' for token in TOKEN.findall(query))
+
+    def index(self, post_id, text):
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [post_id]
+            )
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, text) VALUES (%s, %s)',
+                [post_id, text],
+            )
+
+    def remove(self, post_id):
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [post_id]
+            )
+
+    def rebuild(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, text) '
+                f'SELECT id, text FROM {Post._meta.db_table}'
+            )
+
+    def count(self, query):
+        expression = self.match_expression(query)
+        if not expression:
+            return 0
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT COUNT(*) FROM {FTS_TABLE} '
+                f'WHERE {FTS_TABLE} MATCH %s',
+                [expression],
+            )
+            return cursor.fetchone()[0]
+
+    def search(self, query, offset, limit):
+        expression = self.match_expression(query)
+        if not expression:
+            return []
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid FROM {FTS_TABLE} '
+                f'WHERE {FTS_TABLE} MATCH %s '
+                'ORDER BY rank LIMIT %s OFFSET %s',
+                [expression, limit, offset],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+
+class DatabaseBackend(SearchBackend):
+    """Запасной движок без индекса: поиск через icontains.
+
+    Подходит для СУБД без поддерживаемого полнотекстового поиска.
+    """
+
+    def index(self, post_id, text):
+        pass
+
+    def remove(self, post_id):
+        pass
+
+    def rebuild(self):
+        pass
+
+    def _matches(self, query):
+        posts = Post.objects.using(self.alias)
+        tokens = TOKEN.findall(query)
+        if not tokens:
+            return posts.none()
+        for token in tokens:
+            posts = posts.filter(text__icontains=token)
+        return posts
+
+    def count(self, query):
+        return self._matches(query).count()
+
+    def search(self, query, offset, limit):
+        return list(self._matches(query).values_list(
+            'pk', flat=True
+        )[offset:offset + limit])
+
+
+VENDOR_BACKENDS = {
+    'sqlite': SQLiteFTSBackend,
+}
+
+
+def get_backend():
+    """Движок из settings.SEARCH_BACKEND либо по типу базы данных."""
+    alias = router.db_for_write(Post)
+    path = getattr(settings, 'SEARCH_BACKEND', None)
+    if path:
+        return import_string(path)(alias)
+    vendor = connections[alias].vendor
+    return VENDOR_BACKENDS.get(vendor, DatabaseBackend)(alias)
+
+
+class SearchResults:
+    """Ленивая выдача поиска, совместимая с django Paginator."""
+
+    def __init__(self, query, backend=None):
+        self.query = query
+        self.backend = backend or get_backend()
+
+    @cached_property
+    def total(self):
+        return self.backend.count(self.query)
+
+    def count(self):
+        return self.total
+
+    def __len__(self):
+        return self.total
+
+    def __getitem__(self, item):
+        if not isinstance(item, slice):
+            return self[item:item + 1][0]
+        start = item.start or 0
+        stop = self.total if item.stop is None else item.stop
+        post_ids = self.backend.search(self.query, start, stop - start)
+        posts = Post.objects.select_related('author', 'group').in_bulk(
+            post_ids
+        )
+        return [posts[pk] for pk in post_ids if pk in posts]
@@ -0,0 +1,163 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import counters, feeds, fragments, page_cache, search, tasks
+from .models import Comment, Follow, Group, Post, User
+
+
+@receiver(post_save, sender=Post)
+def fan_out_post(sender, instance, created, raw=False, **kwargs):
+    """Ставит в очередь раскладку нового поста по лентам подписчиков."""
+    if created and not raw:
+        tasks.fan_out_post.delay(instance.pk)
+
+
+@receiver(post_save, sender=Follow)
+def backfill_feed(sender, instance, created, raw=False, **kwargs):
+    """Заполняет ленту постами автора при подписке."""
+    if created and not raw:
+        feeds.backfill(instance.user_id, instance.author_id)
+
+
+@receiver(post_delete, sender=Follow)
+def prune_feed(sender, instance, **kwargs):
+    """Чистит ленту от постов автора при отписке."""
+    feeds.prune(instance.user_id, instance.author_id)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def bump_post_card(sender, instance, **kwargs):
+    """Сбрасывает кэш карточки изменённого поста."""
+    fragments.bump_version('post', instance.pk)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def bump_commented_post_card(sender, instance, **kwargs):
+    """Сбрасывает кэш карточки поста при изменении его комментариев."""
+    if instance.post_id:
+        fragments.bump_version('post', instance.post_id)
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def bump_group_cards(sender, instance, **kwargs):
+    """Сбрасывает кэш карточек постов группы."""
+    fragments.bump_version('group', instance.pk)
+
+
+@receiver(post_save, sender=User)
+def bump_author_cards(sender, instance, update_fields=None, **kwargs):
+    """Сбрасывает кэш карточек автора, кроме обновления last_login."""
+    if update_fields and set(update_fields) == {'last_login'}:
+        return
+    fragments.bump_version('user', instance.pk)
+
+
+@receiver(post_save, sender=Post)
+def count_new_post(sender, instance, created, raw=False, **kwargs):
+    """Учитывает новый пост в статистике автора."""
+    if created and not raw:
+        counters.adjust(instance.author_id, posts_count=1)
+
+
+@receiver(post_delete, sender=Post)
+def count_deleted_post(sender, instance, **kwargs):
+    """Учитывает удаление поста в статистике автора."""
+    counters.adjust(instance.author_id, posts_count=-1)
+
+
+@receiver(post_save, sender=Follow)
+def count_new_follow(sender, instance, created, raw=False, **kwargs):
+    """Учитывает подписку в статистике обоих пользователей."""
+    if created and not raw:
+        counters.adjust(instance.author_id, followers_count=1)
+        counters.adjust(instance.user_id, following_count=1)
+
+
+@receiver(post_delete, sender=Follow)
+def count_deleted_follow(sender, instance, **kwargs):
+    """Учитывает отписку в статистике обоих пользователей."""
+    counters.adjust(instance.author_id, followers_count=-1)
+    counters.adjust(instance.user_id, following_count=-1)
+
+
+@receiver(post_save, sender=Post)
+def index_post(sender, instance, raw=False, **kwargs):
+    """Ставит в очередь обновление поискового индекса."""
+    if not raw:
+        tasks.index_post.delay(instance.pk)
+
+
+@receiver(post_delete, sender=Post)
+def unindex_post(sender, instance, **kwargs):
+    """Убирает удалённый пост из поискового индекса."""
+    search.get_backend().remove(instance.pk)
+
+
+@receiver(pre_save, sender=Post)
+def remember_old_group(sender, instance, raw=False, **kwargs):
+    """Запоминает прежнюю группу поста, чтобы сбросить и её страницы."""
+    instance._old_group_slug = None
+    if instance.pk and not raw:
+        instance._old_group_slug = Group.objects.filter(
+            posts__pk=instance.pk
+        ).values_list('slug', flat=True).first()
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_pages(sender, instance, raw=False, **kwargs):
+    """Сбрасывает кэш лент, в которых показан пост."""
+    if raw:
+        return
+    scopes = page_cache.post_scopes(instance)
+    old_slug = getattr(instance, '_old_group_slug', None)
+    if old_slug:
+        scopes.append(f'group:{old_slug}')
+    page_cache.bump(*scopes)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_commented_pages(sender, instance, **kwargs):
+    """Сбрасывает кэш лент с карточкой прокомментированного поста."""
+    post = Post.objects.select_related('author', 'group').filter(
+        pk=instance.post_id
+    ).first()
+    if post is not None:
+        page_cache.bump(*page_cache.post_scopes(post))
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def invalidate_group_pages(sender, instance, **kwargs):
+    """Сбрасывает кэш страницы группы и лент со ссылками на неё."""
+    page_cache.bump('index', f'group:{instance.slug}')
+
+
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def invalidate_follow_pages(sender, instance, **kwargs):
+    """Сбрасывает кэш профилей со счётчиками подписок."""
+    page_cache.bump(
+        f'profile:{instance.author.username}',
+        f'profile:{instance.user.username}',
+    )
+
+
+@receiver(post_save, sender=User)
+def invalidate_author_pages(sender, instance, created, update_fields=None,
+                            **kwargs):
+    """Сбрасывает кэш лент, где показано имя автора."""
+    if created or update_fields and set(update_fields) == {'last_login'}:
+        return
+    slugs = Group.objects.filter(
+        posts__author=instance
+    ).values_list('slug', flat=True).distinct()
+    page_cache.bump(
+        'index',
+        f'profile:{instance.username}',
+        *(f'group:{slug}' for slug in slugs),
+    )
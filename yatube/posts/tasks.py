@@ -0,0 +1,30 @@
+from core.tasks import task
+
+from . import feeds, search, thumbnails
+from .models import Post
+
+
+@task
+def build_thumbnail(post_id):
+    """Миниатюра и адаптивные варианты картинки поста."""
+    thumbnails.generate(post_id)
+
+
+@task
+def fan_out_post(post_id):
+    """Раскладывает новый пост по лентам подписчиков автора."""
+    post = Post.objects.filter(pk=post_id).only(
+        'author_id', 'pub_date'
+    ).first()
+    if post is not None:
+        feeds.push_post(post)
+
+
+@task
+def index_post(post_id):
+    """Индексирует текущий текст поста; удалённый пост пропускается."""
+    text = Post.objects.filter(pk=post_id).values_list(
+        'text', flat=True
+    ).first()
+    if text is not None:
+        search.get_backend().index(post_id, text)
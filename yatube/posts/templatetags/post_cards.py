@@ -0,0 +1,19 @@
+from django import template
+from django.utils.safestring import mark_safe
+
+from posts import variants
+from posts.fragments import render_cards
+
+register = template.Library()
+
+
+@register.simple_tag
+def post_cards(posts, flag_group_link=True):
+    """Возвращает отрендеренные карточки постов из кэша фрагментов."""
+    return [mark_safe(card) for card in render_cards(posts, flag_group_link)]
+
+
+@register.filter
+def image_sources(post):
+    """Возвращает srcset картинки поста, сгруппированные по форматам."""
+    return variants.sources(post)
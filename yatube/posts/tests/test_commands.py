@@ -0,0 +1,100 @@
+import os
+import shutil
+import tempfile
+from datetime import datetime
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from ..models import Group, Post, User
+
+
+class TransferCommandsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='exporter')
+        cls.group = Group.objects.create(title='Экспорт', slug='export')
+        cls.published = timezone.make_aware(datetime(2020, 5, 17, 12, 30))
+        for number in range(3):
+            Post.objects.create(
+                text=f'Пост для выгрузки {number}',
+                author=cls.author,
+                group=cls.group if number % 2 else None,
+            )
+        Post.objects.update(pub_date=cls.published)
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def round_trip(self, name):
+        path = os.path.join(self.directory, name)
+        call_command('export_posts', path, stderr=StringIO())
+        Post.objects.all().delete()
+        call_command('import_posts', path, batch_size=2, stdout=StringIO())
+        return path
+
+    def test_round_trip_keeps_posts(self):
+        for name in ('posts.jsonl', 'posts.csv'):
+            with self.subTest(name=name):
+                expected = set(Post.objects.values_list(
+                    'text', 'author', 'group', 'pub_date'
+                ))
+                self.round_trip(name)
+                self.assertEqual(set(Post.objects.values_list(
+                    'text', 'author', 'group', 'pub_date'
+                )), expected)
+
+    def test_unknown_author_skipped_or_created(self):
+        path = os.path.join(self.directory, 'new.jsonl')
+        with open(path, 'w', encoding='utf-8') as output:
+            output.write(
+                '{"author": "newcomer", "group": "new-group", '
+                '"text": "Привет"}\n'
+            )
+        stdout = StringIO()
+        call_command('import_posts', path, stdout=stdout)
+        self.assertIn('пропущено: 1', stdout.getvalue())
+        call_command(
+            'import_posts', path, create_missing=True, stdout=StringIO()
+        )
+        post = Post.objects.get(text='Привет')
+        self.assertEqual(post.author.username, 'newcomer')
+        self.assertEqual(post.group.slug, 'new-group')
+
+    def test_impossible_date_skipped(self):
+        path = os.path.join(self.directory, 'dates.jsonl')
+        with open(path, 'w', encoding='utf-8') as output:
+            output.write(
+                '{"author": "exporter", "text": "Нет такой даты", '
+                '"pub_date": "2024-13-45T00:00"}\n'
+                '{"author": "exporter", "text": "Есть дата", '
+                '"pub_date": "2024-02-29T00:00"}\n'
+            )
+        stdout = StringIO()
+        call_command('import_posts', path, stdout=stdout)
+        self.assertIn('пропущено: 1', stdout.getvalue())
+        self.assertFalse(Post.objects.filter(text='Нет такой даты').exists())
+        self.assertTrue(Post.objects.filter(text='Есть дата').exists())
+
+    def test_malformed_lines_skipped(self):
+        path = os.path.join(self.directory, 'broken.jsonl')
+        with open(path, 'w', encoding='utf-8') as output:
+            output.write(
+                '{"author": "exporter", "text": "До ошибки"}\n'
+                '{"author": "exporter", "text": \n'
+                '["не", "словарь"]\n'
+                '{"author": "exporter", "text": "После ошибки"}\n'
+            )
+        stdout = StringIO()
+        call_command(
+            'import_posts', path, create_missing=True, stdout=stdout
+        )
+        self.assertIn('Импортировано постов: 2, пропущено: 2',
+                      stdout.getvalue())
+        self.assertTrue(Post.objects.filter(text='После ошибки').exists())
@@ -1,10 +1,25 @@
-from django.test import Client, TestCase
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+
+from PIL import Image
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
 from django.urls import reverse
 from django.core.files.uploadedfile import SimpleUploadedFile
 
+from core.models import Task
+
 from ..models import Post, User, Group, Comment
+from ..thumbnails import generate
+from ..variants import supported_formats
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp()
 
 
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
 class PostCreateTests(TestCase):
     @classmethod
     def setUpClass(cls):
@@ -35,6 +50,11 @@ class PostCreateTests(TestCase):
             content_type='image/gif'
         )
 
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
     def setUp(self):
         """Создаём авторизованного пользователя и автора."""
         self.author_client = Client()
@@ -146,3 +166,88 @@ class CommentFormTest(TestCase):
         self.assertEqual(comment.text, form_data['text'])
         self.assertEqual(comment.author, self.author)
         self.assertEqual(comment.post.id, self.post.id)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ThumbnailTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='thumb_author')
+        image = BytesIO()
+        Image.new('RGB', (40, 20), color=(255, 0, 0)).save(image, 'png')
+        cls.post = Post.objects.create(
+            author=cls.author,
+            text='Пост с картинкой',
+            image=SimpleUploadedFile('red.png', image.getvalue()),
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def test_generate_stores_thumbnail_url(self):
+        """Миниатюра строится заранее и её адрес хранится в посте."""
+        generate(self.post.pk)
+        self.post.refresh_from_db()
+        self.assertTrue(
+            self.post.image_thumbnail.startswith(settings.MEDIA_URL)
+        )
+        response = Client().get(
+            reverse('posts:post_detail', kwargs={'post_id': self.post.pk})
+        )
+        self.assertContains(response, self.post.image_thumbnail)
+
+    def test_generate_invalidates_cached_feed(self):
+        """После построения миниатюры закэшированная лента обновляется."""
+        cache.clear()
+        Post.objects.filter(pk=self.post.pk).update(image_thumbnail='')
+        guest = Client()
+        profile = reverse(
+            'posts:profile', kwargs={'username': self.author.username}
+        )
+        guest.get(profile)
+        url = generate(self.post.pk)
+        response = guest.get(profile)
+        self.assertContains(response, url)
+
+    @override_settings(TASKS_EAGER=False)
+    def test_new_image_drops_old_thumbnail(self):
+        """Новая картинка сразу убирает миниатюру и варианты прежней."""
+        generate(self.post.pk)
+        image = BytesIO()
+        Image.new('RGB', (40, 20), color=(0, 0, 255)).save(image, 'png')
+        client = Client()
+        client.force_login(self.author)
+        client.post(
+            reverse('posts:post_edit', kwargs={'post_id': self.post.pk}),
+            data={
+                'text': self.post.text,
+                'image': SimpleUploadedFile('blue.png', image.getvalue()),
+            },
+        )
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.image_thumbnail, '')
+        self.assertFalse(self.post.image_variants.exists())
+        self.assertTrue(Task.objects.filter(
+            name='posts.tasks.build_thumbnail'
+        ).exists())
+
+    def test_variants_exposed_as_srcset(self):
+        """Варианты картинки строятся в поддерживаемых форматах
+        и попадают в srcset карточки."""
+        cache.clear()
+        generate(self.post.pk)
+        formats = set(self.post.image_variants.values_list(
+            'format', flat=True
+        ))
+        self.assertEqual(formats, set(supported_formats()))
+        self.assertIn('jpeg', formats)
+        variant = self.post.image_variants.get(format='jpeg')
+        self.assertEqual(variant.width, min(settings.POST_IMAGE_WIDTHS))
+        response = Client().get(reverse('posts:index'))
+        self.assertContains(response, f'{variant.file.url} {variant.width}w')
+        report = StringIO()
+        call_command('image_storage_report', stdout=report)
+        self.assertIn('jpeg', report.getvalue())
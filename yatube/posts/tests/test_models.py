@@ -1,7 +1,10 @@
+from io import StringIO
+
 from django.test import TestCase
 from django.contrib.auth import get_user_model
+from django.core.management import call_command
 
-from ..models import Group, Post
+from ..models import Group, Post, Follow, UserStats
 
 
 User = get_user_model()
@@ -54,3 +57,41 @@ class PostModelTest(TestCase):
         self.assertEqual(
             self.post.text[:Post.FIRST_TEXT], str(self.post)
         )
+
+
+class UserStatsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='stats_author')
+        cls.reader = User.objects.create_user(username='stats_reader')
+
+    def test_counters_follow_changes(self):
+        """Счётчики обновляются при постах, подписках и отписках."""
+        post = Post.objects.create(author=self.author, text='Пост')
+        Post.objects.create(author=self.author, text='Ещё пост')
+        Follow.objects.create(user=self.reader, author=self.author)
+        post.delete()
+        author_stats = UserStats.objects.get(user=self.author)
+        self.assertEqual(author_stats.posts_count, 1)
+        self.assertEqual(author_stats.followers_count, 1)
+        self.assertEqual(
+            UserStats.objects.get(user=self.reader).following_count, 1
+        )
+        Follow.objects.filter(user=self.reader).delete()
+        author_stats.refresh_from_db()
+        self.assertEqual(author_stats.followers_count, 0)
+
+    def test_reconcile_repairs_drift(self):
+        """reconcile_stats чинит счётчики после массовых операций."""
+        Post.objects.bulk_create([
+            Post(author=self.author, text=f'Пост {i}') for i in range(3)
+        ])
+        UserStats.objects.update(posts_count=100)
+        call_command('reconcile_stats', stdout=StringIO())
+        self.assertEqual(
+            UserStats.objects.get(user=self.author).posts_count, 3
+        )
+        self.assertEqual(
+            UserStats.objects.get(user=self.reader).posts_count, 0
+        )
@@ -0,0 +1,183 @@
+import json
+import re
+import tempfile
+from io import StringIO
+from unittest import skipUnless
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import Comment, Follow, Group, Post, User
+
+
+class FeedQueryCountTest(TestCase):
+    """Число запросов ленты не должно расти вместе с размером страницы."""
+    POSTS = 12
+    COMMENTS_PER_POST = 4
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='feed_author')
+        cls.reader = User.objects.create_user(username='feed_reader')
+        cls.commenter = User.objects.create_user(username='feed_commenter')
+        cls.group = Group.objects.create(title='Лента', slug='feed')
+        Follow.objects.create(user=cls.reader, author=cls.author)
+        for number in range(cls.POSTS):
+            post = Post.objects.create(
+                text=f'Пост {number}',
+                author=cls.author,
+                group=cls.group,
+            )
+            for comment in range(cls.COMMENTS_PER_POST):
+                Comment.objects.create(
+                    post=post,
+                    author=cls.commenter,
+                    text=f'Комментарий {comment}',
+                )
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.reader)
+
+    def count_queries(self, url):
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries), response.context['page_obj']
+
+    def test_feed_query_count_is_constant(self):
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile', kwargs={'username': self.author}),
+            reverse('posts:follow_index'),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                with override_settings(COUNT_POST=2):
+                    small, _ = self.count_queries(url)
+                with override_settings(COUNT_POST=10):
+                    large, page_obj = self.count_queries(url)
+                self.assertEqual(small, large)
+                self.assertEqual(len(page_obj), 10)
+
+    @override_settings(LATEST_COMMENTS=2)
+    def test_feed_posts_have_comment_activity(self):
+        _, page_obj = self.count_queries(reverse('posts:index'))
+        for post in page_obj:
+            with self.subTest(post=post.pk):
+                self.assertEqual(post.comments_count, self.COMMENTS_PER_POST)
+                self.assertEqual(
+                    [comment.text for comment in post.latest_comments],
+                    ['Комментарий 3', 'Комментарий 2'],
+                )
+
+    def test_cached_cards_skip_comment_query(self):
+        url = reverse('posts:profile', kwargs={'username': self.author})
+        self.count_queries(url)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url)
+        self.assertFalse(any(
+            'posts_comment' in query['sql']
+            for query in queries.captured_queries
+        ))
+
+class BenchCommandsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_generate_data_and_run_benchmark(self):
+        call_command(
+            'generate_bench_data', users=20, groups=2, posts=60,
+            comments=40, stdout=StringIO(),
+        )
+        self.assertEqual(Post.objects.count(), 60)
+        self.assertEqual(Comment.objects.count(), 40)
+        self.assertGreater(
+            Post.objects.values('pub_date').distinct().count(), 1
+        )
+        with tempfile.NamedTemporaryFile(suffix='.json') as output:
+            call_command(
+                'bench_feeds', requests=3, warmup=0,
+                views=['index', 'post_detail'], output=output.name,
+                stdout=StringIO(),
+            )
+            results = json.load(output)
+        self.assertEqual(set(results['views']), {'index', 'post_detail'})
+        for row in results['views'].values():
+            self.assertEqual(row['count'], 3)
+            self.assertGreater(row['p99'], 0)
+
+    def test_generate_data_twice(self):
+        for _ in range(2):
+            call_command(
+                'generate_bench_data', users=10, groups=1, posts=5,
+                comments=0, follows=8, alpha=0.1, stdout=StringIO(),
+            )
+        self.assertEqual(Post.objects.count(), 10)
+        self.assertEqual(
+            User.objects.filter(username__startswith='bench_').count(), 20
+        )
+
+
+# SQLite до 3.36 пишет «SCAN TABLE posts_post», новее — «SCAN posts_post».
+# Подзапросы вроде «SCAN ranked» проходят уже отобранные строки.
+TABLE_SCAN = re.compile(r'SCAN (TABLE )?(posts|auth|django)_\w+')
+
+
+@skipUnless(connection.vendor == 'sqlite', 'EXPLAIN QUERY PLAN есть в SQLite')
+class FeedQueryPlanTest(TestCase):
+    """Запросы лент идут по индексам и не сортируют во временном B-дереве."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='plan_author')
+        cls.reader = User.objects.create_user(username='plan_reader')
+        cls.group = Group.objects.create(title='План', slug='plan')
+        Follow.objects.create(user=cls.reader, author=cls.author)
+        for number in range(15):
+            cls.post = Post.objects.create(
+                text=f'Пост {number}', author=cls.author, group=cls.group,
+            )
+            Comment.objects.create(
+                post=cls.post, author=cls.reader, text='Комментарий',
+            )
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.reader)
+
+    def query_plan(self, sql):
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            return [row[-1] for row in cursor.fetchall()]
+
+    def test_feed_queries_use_indexes(self):
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:index') + '?cursor=',
+            reverse('posts:group_list', args=(self.group.slug,)),
+            reverse('posts:profile', args=(self.author.username,)),
+            reverse('posts:post_detail', args=(self.post.pk,)),
+            reverse('posts:follow_index'),
+        )
+        for url in urls:
+            with CaptureQueriesContext(connection) as queries:
+                self.client.get(url)
+            for query in queries.captured_queries:
+                if not query['sql'].startswith('SELECT'):
+                    continue
+                plan = self.query_plan(query['sql'])
+                with self.subTest(url=url, sql=query['sql'][:120]):
+                    for step in plan:
+                        self.assertNotIn('TEMP B-TREE', step)
+                        if TABLE_SCAN.match(step):
+                            self.assertIn('INDEX', step)
@@ -60,6 +60,14 @@ class URLTests(TestCase):
                     'posts:post_create'
                 ),
             ),
+            (
+                'includes/comment_list.html',
+                reverse(
+                    'posts:post_comments', kwargs={
+                        'post_id': self.post.pk
+                    }
+                ),
+            ),
         ]
         for template, reverse_temp in templates_url_names:
             with self.subTest(address=template):
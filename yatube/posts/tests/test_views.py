@@ -1,15 +1,30 @@
+import shutil
+import tempfile
+from io import StringIO
 from math import ceil
 
-from django.test import TestCase, Client
+from django.test import TestCase, Client, override_settings
 from django.urls import reverse
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.core.cache import cache
 from django.conf import settings
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from core.tasks import run_pending
 
 from ..forms import PostForm
-from ..models import Post, Group, User, Comment, Follow
+from ..fragments import (
+    HITS_KEY, flush_stats, render_cards, stats as card_stats,
+)
+from ..models import Post, Group, User, Comment, Follow, FeedEntry
+from ..thumbnails import generate
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp()
 
 
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
 class PostViewsTests(TestCase):
     @classmethod
     def setUpClass(cls):
@@ -49,6 +64,11 @@ class PostViewsTests(TestCase):
             text='Тестовый коммент',
         )
 
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
     def setUp(self):
         self.guest_client = Client()
         self.authorized_client = Client()
@@ -115,14 +135,18 @@ class PostViewsTests(TestCase):
             self.assertEqual(value, expected)
 
     def test_cache_context(self):
-        """Проверка кэширования страницы index"""
+        """Проверка кэширования страницы index.
+
+        Фрагмент живёт до сброса кэша или до изменения ленты; запись
+        в обход сигналов ленту для кэша не меняет.
+        """
         before_create_post = self.authorized_client.get(
             reverse('posts:index'))
         first_item_before = before_create_post.content
-        Post.objects.create(
+        Post.objects.bulk_create([Post(
             author=self.user,
             text='Проверка кэша',
-            group=self.group)
+            group=self.group)])
         after_create_post = self.authorized_client.get(reverse('posts:index'))
         first_item_after = after_create_post.content
         self.assertEqual(first_item_after, first_item_before)
@@ -187,6 +211,43 @@ class PaginatorViewsTest(TestCase):
                 ) * settings.COUNT_POST
             )
 
+    def test_cursor_paginator_walks_feed(self):
+        """Курсорная пагинация проходит ленту вперёд и назад без COUNT."""
+        url = reverse('posts:index')
+        expected = list(Post.objects.order_by('-pub_date', '-pk'))
+        seen = []
+        pages = []
+        cursor = ''
+        while cursor is not None:
+            cache.clear()
+            with CaptureQueriesContext(connection) as queries:
+                page_obj = self.guest_client.get(
+                    url, {'cursor': cursor}
+                ).context['page_obj']
+            # COUNT(...) OVER в запросе последних комментариев
+            # к постам страницы к пагинации не относится.
+            self.assertFalse(any(
+                'COUNT(' in query['sql'] for query in queries
+                if 'FROM "posts_comment"' not in query['sql']
+            ))
+            pages.append(list(page_obj))
+            seen.extend(page_obj)
+            cursor = page_obj.next_cursor
+        self.assertEqual(seen, expected)
+        self.assertEqual(len(pages), self.NUMBER_OF_PAGES)
+        cache.clear()
+        previous_page = self.guest_client.get(
+            url, {'cursor': page_obj.previous_cursor}
+        ).context['page_obj']
+        self.assertEqual(list(previous_page), pages[-2])
+
+    def test_broken_cursor_returns_first_page(self):
+        """Битый курсор открывает первую страницу."""
+        response = self.guest_client.get(
+            reverse('posts:index'), {'cursor': 'not-a-cursor'}
+        )
+        self.assertEqual(len(response.context['page_obj']), settings.COUNT_POST)
+
 
 class FollowViewsTest(TestCase):
     @classmethod
@@ -264,3 +325,361 @@ class FollowViewsTest(TestCase):
             reverse('posts:follow_index'))
         new_post_unfollower = response_unfollower.context['page_obj']
         self.assertNotIn(new_post_follower, new_post_unfollower)
+
+    def test_feed_inbox_follows_subscription(self):
+        """Подписка заполняет ленту, новый пост доставляется,
+         отписка очищает ленту."""
+        self.authorized_client.get(reverse(
+            'posts:profile_follow',
+            kwargs={'username': self.author}
+        ))
+        self.assertTrue(FeedEntry.objects.filter(
+            user=self.user, post=self.post
+        ).exists())
+        new_post = Post.objects.create(
+            author=self.author,
+            text='Новый пост'
+        )
+        response = self.authorized_client.get(reverse('posts:follow_index'))
+        self.assertEqual(
+            list(response.context['page_obj']), [new_post, self.post]
+        )
+        self.authorized_client.get(reverse(
+            'posts:profile_unfollow',
+            kwargs={'username': self.author}
+        ))
+        self.assertFalse(FeedEntry.objects.filter(user=self.user).exists())
+
+    @override_settings(TASKS_EAGER=False)
+    def test_fan_out_runs_in_worker(self):
+        """Раскладка нового поста и индексация ждут воркера."""
+        Follow.objects.create(user=self.user, author=self.author)
+        new_post = Post.objects.create(author=self.author, text='Очередь')
+        self.assertFalse(FeedEntry.objects.filter(post=new_post).exists())
+        self.assertEqual(run_pending(), 2)
+        self.assertTrue(FeedEntry.objects.filter(
+            user=self.user, post=new_post
+        ).exists())
+
+    def test_rebuild_feeds_command(self):
+        """Команда rebuild_feeds восстанавливает ленты по подпискам."""
+        Follow.objects.create(user=self.user, author=self.author)
+        FeedEntry.objects.all().delete()
+        call_command('rebuild_feeds', stdout=StringIO())
+        self.assertEqual(
+            list(FeedEntry.objects.values_list('user', 'post')),
+            [(self.user.pk, self.post.pk)]
+        )
+
+
+class PostCardCacheTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='card_author')
+        cls.group = Group.objects.create(
+            title='Группа карточек',
+            slug='cards',
+        )
+        cls.post = Post.objects.create(
+            text='Исходный текст',
+            author=cls.user,
+            group=cls.group,
+        )
+
+    def setUp(self):
+        flush_stats()
+        cache.clear()
+
+    def test_card_served_from_cache(self):
+        """Повторный рендер карточки берётся из кэша."""
+        first = render_cards([self.post], True)
+        second = render_cards([self.post], True)
+        self.assertEqual(first, second)
+        self.assertEqual(card_stats()['hits'], 1)
+        self.assertEqual(card_stats()['misses'], 1)
+
+    def test_stats_flushed_to_cache_in_batches(self):
+        """Рендер не пишет счётчики в общий кэш на каждый запрос."""
+        render_cards([self.post], True)
+        render_cards([self.post], True)
+        self.assertIsNone(cache.get(HITS_KEY))
+        self.assertEqual(card_stats()['hits'], 1)
+        self.assertEqual(cache.get(HITS_KEY), 1)
+
+    def test_card_invalidated_on_change(self):
+        """Изменение поста, группы или автора сбрасывает карточку."""
+        render_cards([self.post], False)
+        self.post.text = 'Новый текст поста'
+        self.post.save()
+        self.assertIn('Новый текст поста', render_cards([self.post], False)[0])
+        self.user.first_name = 'Иван'
+        self.user.save()
+        self.assertIn('Иван', render_cards([self.post], False)[0])
+        self.assertEqual(card_stats()['hits'], 0)
+
+
+class CommentsPaginationTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.TEST_COMMENTS = 25
+        cls.user = User.objects.create_user(username='commenter')
+        cls.post = Post.objects.create(text='Вирусный пост', author=cls.user)
+        Comment.objects.bulk_create(
+            Comment(post=cls.post, author=cls.user, text=f'Коммент {number}')
+            for number in range(cls.TEST_COMMENTS)
+        )
+
+    def setUp(self):
+        self.guest_client = Client()
+
+    def test_post_detail_loads_first_comments_page(self):
+        """На странице поста выводится только первая порция комментариев."""
+        response = self.guest_client.get(
+            reverse('posts:post_detail', kwargs={'post_id': self.post.pk})
+        )
+        comments = response.context['comments']
+        self.assertEqual(len(comments), settings.COUNT_COMMENTS)
+        self.assertEqual(comments[0].text, 'Коммент 0')
+        self.assertTrue(comments.has_next())
+
+    def test_load_more_returns_next_fragment(self):
+        """Фрагмент «показать ещё» отдаёт оставшиеся комментарии."""
+        first = self.guest_client.get(
+            reverse('posts:post_detail', kwargs={'post_id': self.post.pk})
+        ).context['comments']
+        response = self.guest_client.get(
+            reverse('posts:post_comments', kwargs={'post_id': self.post.pk}),
+            {'cursor': first.next_cursor},
+        )
+        comments = response.context['comments']
+        self.assertEqual(
+            [comment.text for comment in comments],
+            [f'Коммент {number}' for number in range(
+                settings.COUNT_COMMENTS, self.TEST_COMMENTS
+            )],
+        )
+        self.assertFalse(comments.has_next())
+        self.assertTemplateNotUsed(response, 'base.html')
+
+    def test_comments_of_missing_post_not_found(self):
+        """Фрагмент комментариев несуществующего поста — 404."""
+        response = self.guest_client.get(
+            reverse('posts:post_comments', kwargs={'post_id': 10 ** 6})
+        )
+        self.assertEqual(response.status_code, 404)
+
+
+class SearchViewsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='searcher')
+        cls.cat_post = Post.objects.create(
+            text='Кошки спят почти весь день', author=cls.user
+        )
+        cls.dog_post = Post.objects.create(
+            text='Собаки любят гулять', author=cls.user
+        )
+
+    def setUp(self):
+        self.guest_client = Client()
+
+    def search(self, query):
+        response = self.guest_client.get(reverse('posts:search'), {'q': query})
+        self.assertTemplateUsed(response, 'posts/search.html')
+        return list(response.context['page_obj'] or [])
+
+    def test_search_finds_by_word_prefix(self):
+        """Поиск находит посты по началу слова без учёта регистра."""
+        self.assertEqual(self.search('кошк'), [self.cat_post])
+        self.assertEqual(self.search('СОБАКИ гулять'), [self.dog_post])
+        self.assertEqual(self.search('"OR* NEAR('), [])
+
+    def test_search_index_follows_changes(self):
+        """Индекс обновляется при изменении и удалении поста."""
+        self.cat_post.text = 'Коты охотятся ночью'
+        self.cat_post.save()
+        self.assertEqual(self.search('кошки'), [])
+        self.assertEqual(self.search('охотятся'), [self.cat_post])
+        self.dog_post.delete()
+        self.assertEqual(self.search('собаки'), [])
+
+    def test_rebuild_search_index_command(self):
+        """Команда полной переиндексации подхватывает bulk_create."""
+        Post.objects.bulk_create([Post(text='Попугаи говорят', author=self.user)])
+        self.assertEqual(self.search('попугаи'), [])
+        call_command('rebuild_search_index', stdout=StringIO())
+        self.assertEqual(len(self.search('попугаи')), 1)
+
+
+class PageCacheTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='cached_author')
+        cls.group = Group.objects.create(title='Кэш', slug='cached')
+        cls.other_group = Group.objects.create(title='Другая', slug='other')
+        cls.post = Post.objects.create(
+            text='Кэшируемый пост', author=cls.author, group=cls.group
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile', kwargs={'username': self.author}),
+        )
+
+    def assertCacheState(self, url, state):
+        response = self.guest_client.get(url)
+        self.assertEqual(response['X-Cache'], state)
+        return response
+
+    def test_anonymous_pages_are_cached(self):
+        """Повторный анонимный запрос отдаётся из кэша."""
+        for url in self.urls:
+            with self.subTest(url=url):
+                self.assertCacheState(url, 'MISS')
+                self.assertCacheState(url, 'HIT')
+                self.assertCacheState(url + '?page=2', 'MISS')
+
+    def test_authorized_pages_are_not_cached(self):
+        """Страницы для авторизованных пользователей не кэшируются."""
+        self.guest_client.force_login(self.author)
+        response = self.guest_client.get(self.urls[0])
+        self.assertFalse(response.has_header('X-Cache'))
+
+    def test_post_change_invalidates_pages(self):
+        """Изменение поста сбрасывает кэш всех лент, где он показан."""
+        for url in self.urls:
+            self.assertCacheState(url, 'MISS')
+        other_group_url = reverse(
+            'posts:group_list', kwargs={'slug': self.other_group.slug}
+        )
+        self.assertCacheState(other_group_url, 'MISS')
+        self.post.text = 'Новый текст'
+        self.post.group = self.other_group
+        self.post.save()
+        for url in self.urls + (other_group_url,):
+            with self.subTest(url=url):
+                response = self.assertCacheState(url, 'MISS')
+                if url != self.urls[1]:
+                    self.assertContains(response, 'Новый текст')
+        self.assertContains(self.assertCacheState(self.urls[2], 'HIT'),
+                            'Новый текст')
+
+    def test_unrelated_change_keeps_cache(self):
+        """Подписка сбрасывает только профили участников."""
+        for url in self.urls:
+            self.assertCacheState(url, 'MISS')
+        reader = User.objects.create_user(username='reader')
+        Follow.objects.create(user=reader, author=self.author)
+        self.assertCacheState(self.urls[0], 'HIT')
+        self.assertCacheState(self.urls[1], 'HIT')
+        self.assertCacheState(self.urls[2], 'MISS')
+
+
+class ConditionalGetTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='etag_author')
+        cls.reader = User.objects.create_user(username='etag_reader')
+        cls.group = Group.objects.create(title='ETag', slug='etag')
+        cls.post = Post.objects.create(
+            text='Пост с валидаторами', author=cls.author, group=cls.group
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile', kwargs={'username': self.author}),
+            reverse('posts:post_detail', kwargs={'post_id': self.post.pk}),
+        )
+
+    def assertNotModified(self, url, etag, not_modified=True):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        if not_modified:
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(response.content, b'')
+            self.assertLessEqual(len(queries), 2)
+        else:
+            self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_matching_etag_returns_not_modified(self):
+        """Повторный запрос с тем же ETag получает 304 без рендера."""
+        for url in self.urls:
+            with self.subTest(url=url):
+                response = self.guest_client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertTrue(response['ETag'].startswith('W/"'))
+                self.assertIn('no-cache', response['Cache-Control'])
+                self.assertIn('Last-Modified', response)
+                self.assertNotModified(url, response['ETag'])
+                self.assertNotModified(url, 'W/"stale"', not_modified=False)
+
+    def test_changes_produce_new_etag(self):
+        """Новый пост, правка и комментарий меняют ETag страниц."""
+        etags = {url: self.guest_client.get(url)['ETag'] for url in self.urls}
+        self.post.text = 'Исправленный текст'
+        self.post.save()
+        for url, etag in etags.items():
+            with self.subTest(url=url):
+                response = self.assertNotModified(
+                    url, etag, not_modified=False
+                )
+                self.assertContains(response, 'Исправленный текст')
+        detail = self.urls[-1]
+        etag = self.guest_client.get(detail)['ETag']
+        Comment.objects.create(post=self.post, author=self.reader, text='Да')
+        self.assertNotModified(detail, etag, not_modified=False)
+
+    def test_thumbnail_produces_new_etag(self):
+        """Готовая миниатюра меняет ETag лент и страницы поста."""
+        etags = {url: self.guest_client.get(url)['ETag'] for url in self.urls}
+        generate(self.post.pk)
+        for url, etag in etags.items():
+            with self.subTest(url=url):
+                self.assertNotModified(url, etag, not_modified=False)
+
+    def test_etag_changes_with_csrf_token(self):
+        """После повторного входа страница с формой приходит заново."""
+        detail = self.urls[-1]
+        self.guest_client.force_login(self.reader)
+        etag = self.guest_client.get(detail)['ETag']
+        response = self.guest_client.get(detail, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.guest_client.logout()
+        self.guest_client.force_login(self.reader)
+        response = self.guest_client.get(detail, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_etag_depends_on_viewer(self):
+        """Авторизованный пользователь не получает 304 на чужую копию."""
+        etag = self.guest_client.get(self.urls[0])['ETag']
+        self.guest_client.force_login(self.reader)
+        response = self.assertNotModified(
+            self.urls[0], etag, not_modified=False
+        )
+        self.assertIn('private', response['Cache-Control'])
+
+    def test_empty_and_missing_pages_have_no_etag(self):
+        empty = Group.objects.create(title='Пусто', slug='empty')
+        response = self.guest_client.get(
+            reverse('posts:group_list', kwargs={'slug': empty.slug})
+        )
+        self.assertFalse(response.has_header('ETag'))
+        response = self.guest_client.get(
+            reverse('posts:post_detail', kwargs={'post_id': 0})
+        )
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(response.has_header('ETag'))
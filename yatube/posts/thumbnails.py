@@ -0,0 +1,28 @@
+from sorl.thumbnail import get_thumbnail
+
+from . import fragments, page_cache, variants
+from .models import Post
+
+GEOMETRY = '960x339'
+OPTIONS = {'crop': 'center', 'upscale': True}
+
+
+def generate(post_id):
+    """Строит миниатюру и адаптивные варианты картинки поста.
+
+    Пишет через update(), чтобы не запускать сигналы сохранения поста,
+    и сбрасывает кэш карточки и лент, в которых мог остаться исходный адрес.
+    """
+    post = Post.objects.filter(pk=post_id).select_related(
+        'author', 'group'
+    ).only('image', 'author__username', 'group__slug').first()
+    if post is None:
+        return None
+    url = ''
+    if post.image:
+        url = get_thumbnail(post.image, GEOMETRY, **OPTIONS).url
+    variants.build(post)
+    Post.objects.filter(pk=post_id).update(image_thumbnail=url)
+    fragments.bump_version('post', post_id)
+    page_cache.bump(*page_cache.post_scopes(post))
+    return url
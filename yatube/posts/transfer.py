@@ -0,0 +1,173 @@
+import csv
+import json
+from contextlib import contextmanager
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import Group, Post, User
+
+FIELDS = ('id', 'author', 'group', 'text', 'pub_date', 'image')
+FORMATS = ('jsonl', 'csv')
+
+
+@contextmanager
+def explicit_dates(*fields):
+    """Отключает auto_now_add, чтобы bulk_create сохранил заданные даты."""
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def guess_format(path, default='jsonl'):
+    """Формат по расширению файла: .csv — CSV, остальное — JSON Lines."""
+    if path and path.lower().endswith('.csv'):
+        return 'csv'
+    return default
+
+
+def batches(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def read_rows(stream, fmt):
+    """Построчно читает словари из JSON Lines или CSV.
+
+    Вместо строки, которая не разбирается как JSON, отдаётся None:
+    её, как и любое значение не-словарь, PostImporter пропустит.
+    """
+    if fmt == 'csv':
+        yield from csv.DictReader(stream)
+        return
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError:
+            yield None
+
+
+def export_rows(chunk_size):
+    """Посты в порядке id без загрузки всей таблицы в память."""
+    posts = Post.objects.order_by('pk').values_list(
+        'pk', 'author__username', 'group__slug', 'text', 'pub_date', 'image',
+    )
+    for pk, author, group, text, pub_date, image in posts.iterator(
+        chunk_size=chunk_size
+    ):
+        yield {
+            'id': pk,
+            'author': author,
+            'group': group or '',
+            'text': text,
+            'pub_date': pub_date.isoformat(),
+            'image': image or '',
+        }
+
+
+class RowWriter:
+    def __init__(self, stream, fmt):
+        self.stream = stream
+        self.csv = None
+        if fmt == 'csv':
+            self.csv = csv.DictWriter(stream, FIELDS)
+            self.csv.writeheader()
+
+    def write(self, row):
+        if self.csv is not None:
+            self.csv.writerow(row)
+        else:
+            self.stream.write(json.dumps(row, ensure_ascii=False) + '\n')
+
+
+class PostImporter:
+    """Собирает объекты Post из строк экспорта.
+
+    Авторы и группы ищутся по словарям username → id и slug → id,
+    которые заполняются один раз на весь импорт. Неизвестные значения
+    либо создаются (create_missing), либо строка пропускается.
+    """
+
+    def __init__(self, create_missing=False):
+        self.create_missing = create_missing
+        self.authors = dict(User.objects.values_list('username', 'pk'))
+        self.groups = dict(Group.objects.values_list('slug', 'pk'))
+        self.skipped = 0
+        self.touched_authors = set()
+        self.touched_groups = set()
+        self._password = make_password(None)
+
+    def _resolve_missing(self, rows):
+        rows = [row for row in rows if isinstance(row, dict)]
+        authors = {row.get('author') for row in rows} - set(self.authors)
+        groups = {row.get('group') for row in rows} - set(self.groups)
+        authors.discard(None)
+        authors.discard('')
+        groups.discard(None)
+        groups.discard('')
+        if authors:
+            User.objects.bulk_create(
+                [User(username=name, password=self._password)
+                 for name in authors],
+                ignore_conflicts=True,
+            )
+            self.authors.update(User.objects.filter(
+                username__in=authors
+            ).values_list('username', 'pk'))
+        if groups:
+            Group.objects.bulk_create(
+                [Group(title=slug, slug=slug) for slug in groups],
+                ignore_conflicts=True,
+            )
+            self.groups.update(Group.objects.filter(
+                slug__in=groups
+            ).values_list('slug', 'pk'))
+
+    def build(self, rows):
+        if self.create_missing:
+            self._resolve_missing(rows)
+        now = timezone.now()
+        posts = []
+        for row in rows:
+            if not isinstance(row, dict):
+                self.skipped += 1
+                continue
+            author_id = self.authors.get(row.get('author'))
+            slug = row.get('group') or ''
+            group_id = self.groups.get(slug) if slug else None
+            text = row.get('text') or ''
+            if author_id is None or (slug and group_id is None) or not text:
+                self.skipped += 1
+                continue
+            try:
+                pub_date = parse_datetime(row.get('pub_date') or '') or now
+            except ValueError:
+                # Формат верный, но даты нет в календаре: 2024-13-45.
+                self.skipped += 1
+                continue
+            if timezone.is_naive(pub_date):
+                pub_date = timezone.make_aware(pub_date)
+            self.touched_authors.add(row['author'])
+            if slug:
+                self.touched_groups.add(slug)
+            posts.append(Post(
+                author_id=author_id,
+                group_id=group_id,
+                text=text,
+                pub_date=pub_date,
+                image=row.get('image') or '',
+            ))
+        return posts
@@ -0,0 +1,123 @@
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+from . import page_cache
+from .models import PostImageVariant
+
+RATIO = 960 / 339
+PIL_FORMATS = {'avif': 'AVIF', 'webp': 'WEBP', 'jpeg': 'JPEG'}
+EXTENSIONS = {'avif': 'avif', 'webp': 'webp', 'jpeg': 'jpg'}
+MIME_TYPES = {
+    'avif': 'image/avif',
+    'webp': 'image/webp',
+    'jpeg': 'image/jpeg',
+}
+
+
+def supported_formats():
+    """Форматы из настроек, которые умеет кодировать установленный Pillow."""
+    Image.init()
+    return [
+        name for name in settings.POST_IMAGE_FORMATS
+        if PIL_FORMATS.get(name) in Image.SAVE
+    ]
+
+
+def _crop(image):
+    """Обрезает картинку по центру до пропорций карточки поста."""
+    width, height = image.size
+    if width / height > RATIO:
+        new_width = round(height * RATIO)
+        left = (width - new_width) // 2
+        return image.crop((left, 0, left + new_width, height))
+    new_height = round(width / RATIO)
+    top = (height - new_height) // 2
+    return image.crop((0, top, width, top + new_height))
+
+
+def _widths(source_width):
+    """Ширины вариантов без увеличения; самый маленький строится всегда."""
+    widths = sorted(settings.POST_IMAGE_WIDTHS)
+    fitting = [width for width in widths if width <= source_width]
+    return fitting or widths[:1]
+
+
+def _encode(image, name):
+    buffer = BytesIO()
+    if name == 'jpeg' and image.mode != 'RGB':
+        image = image.convert('RGB')
+    image.save(
+        buffer,
+        PIL_FORMATS[name],
+        quality=settings.POST_IMAGE_QUALITY,
+        optimize=name == 'jpeg',
+    )
+    return buffer.getvalue()
+
+
+def clear(post):
+    """Удаляет старые варианты картинки поста вместе с файлами."""
+    for variant in post.image_variants.all():
+        variant.file.delete(save=False)
+    post.image_variants.all().delete()
+
+
+def build(post):
+    """Строит набор вариантов картинки поста по всем ширинам и форматам.
+
+    Закэшированные ленты с прежним srcset сбрасываются.
+    """
+    clear(post)
+    variants = []
+    if post.image:
+        variants = PostImageVariant.objects.bulk_create(_render(post))
+    page_cache.bump(*page_cache.post_scopes(post))
+    return variants
+
+
+def _render(post):
+    """Кодирует ещё не сохранённые в базу варианты картинки поста."""
+    with post.image.open('rb') as source:
+        image = ImageOps.exif_transpose(Image.open(source))
+        image.load()
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'transparency' in image.info
+                              else 'RGB')
+    image = _crop(image)
+    variants = []
+    for width in _widths(image.width):
+        height = max(1, round(width / RATIO))
+        resized = image.resize((width, height), Image.LANCZOS)
+        for name in supported_formats():
+            content = _encode(resized, name)
+            variant = PostImageVariant(
+                post=post, width=width, format=name, size=len(content)
+            )
+            variant.file.save(
+                f'{post.pk}_{width}.{EXTENSIONS[name]}',
+                ContentFile(content),
+                save=False,
+            )
+            variants.append(variant)
+    return variants
+
+
+def sources(post):
+    """Группирует варианты по форматам для тегов <source srcset>.
+
+    Рассчитан на заранее подгруженные post.image_variants, чтобы карточка
+    не делала запросов.
+    """
+    by_format = {}
+    for variant in post.image_variants.all():
+        by_format.setdefault(variant.format, []).append(
+            f'{variant.file.url} {variant.width}w'
+        )
+    return [
+        {'type': MIME_TYPES[name], 'srcset': ', '.join(by_format[name])}
+        for name in settings.POST_IMAGE_FORMATS
+        if name in by_format
+    ]
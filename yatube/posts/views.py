@@ -1,71 +1,144 @@
 from django.shortcuts import get_object_or_404, render, redirect
 from django.contrib.auth.decorators import login_required
-from django.core.paginator import Paginator
 from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import transaction
+
+from core.routers import pin_to_primary, read_from_replica
 
-from .models import Group, Post, User, Follow
+from . import page_cache, tasks, variants
+from .models import Comment, Group, Post, User, Follow
+from .conditional import conditional_feed, conditional_post
+from .counters import stats_for
+from .feeds import feed_for
 from .forms import PostForm, CommentForm
+from .page_cache import cache_anonymous_page
+from .paginators import CursorPaginator, paginate
+from .search import SearchResults
+
+
+def page_breakdown(request, objects):
+    page_obj = paginate(request, objects, settings.COUNT_POST)
+    page_obj.object_list = list(page_obj.object_list)
+    return page_obj
+
+
+def comments_page(post_id, cursor):
+    comments = Comment.objects.filter(
+        post_id=post_id
+    ).select_related('author')
+    return CursorPaginator(
+        comments, settings.COUNT_COMMENTS, field='created', descending=False
+    ).get_page(cursor)
+
+
+def index_scopes():
+    return ('index',)
+
+
+def group_scopes(slug):
+    return (f'group:{slug}',)
 
 
-def page_breakdown(page_number, objects):
-    paginator = Paginator(objects, settings.COUNT_POST)
-    return paginator.get_page(page_number)
+def profile_scopes(username):
+    return (f'profile:{username}',)
 
 
+@read_from_replica
+@conditional_feed(index_scopes, lambda: Post.objects.all())
+@cache_anonymous_page(index_scopes)
 def index(request):
     """Выводит шаблон главной страницы."""
     posts = Post.objects.select_related(
         'author', 'group'
     )
-    page_number = request.GET.get('page')
     context = {
-        'page_obj': page_breakdown(page_number, posts)
+        'page_obj': page_breakdown(request, posts),
+        # Фрагмент {% cache %} сбрасывается вместе с кэшем страницы.
+        'generation': page_cache.generations(index_scopes()),
     }
     return render(request, 'posts/index.html', context)
 
 
+@read_from_replica
+@conditional_feed(
+    group_scopes, lambda slug: Post.objects.filter(group__slug=slug)
+)
+@cache_anonymous_page(group_scopes)
 def group_posts(request, slug):
     group = get_object_or_404(Group, slug=slug)
     posts = group.posts.select_related('author')
-    page_number = request.GET.get('page')
     context = {
         'group': group,
-        'page_obj': page_breakdown(page_number, posts)
+        'page_obj': page_breakdown(request, posts)
     }
     return render(request, 'posts/group_list.html', context)
 
 
+@read_from_replica
+@conditional_feed(
+    profile_scopes,
+    lambda username: Post.objects.filter(author__username=username),
+)
+@cache_anonymous_page(profile_scopes)
 def profile(request, username):
     """Выводит шаблон профайла пользователя"""
     author = get_object_or_404(User, username=username)
     posts = author.posts.select_related('group')
-    page_number = request.GET.get('page')
     context = {
         'author': author,
+        'stats': stats_for(author),
         'following': request.user.is_authenticated
         and author.following.filter(
             user=request.user
         ).exists(),
-        'page_obj': page_breakdown(page_number, posts),
+        'page_obj': page_breakdown(request, posts),
     }
     return render(request, 'posts/profile.html', context)
 
 
+@read_from_replica
+@conditional_post
 def post_detail(request, post_id):
     """Выводит шаблон страницы поста."""
     post = get_object_or_404(
         Post.objects.select_related('group', 'author'),
         pk=post_id
     )
-    comments = post.comments.select_related('author')
     context = {
         'post': post,
-        'comments': comments,
+        'author_stats': stats_for(post.author),
+        'comments': comments_page(post.pk, request.GET.get('cursor')),
         'form': CommentForm()
     }
     return render(request, 'posts/post_detail.html', context)
 
 
+def post_comments(request, post_id):
+    """Отдаёт фрагмент со следующей порцией комментариев поста."""
+    post = get_object_or_404(Post, pk=post_id)
+    context = {
+        'post_id': post.pk,
+        'comments': comments_page(post_id, request.GET.get('cursor')),
+    }
+    return render(request, 'includes/comment_list.html', context)
+
+
+def search(request):
+    """Выводит результаты полнотекстового поиска по постам."""
+    query = request.GET.get('q', '').strip()
+    page_obj = None
+    if query:
+        page_obj = Paginator(
+            SearchResults(query), settings.COUNT_POST
+        ).get_page(request.GET.get('page'))
+    context = {
+        'query': query,
+        'page_obj': page_obj,
+    }
+    return render(request, 'posts/search.html', context)
+
+
 @login_required
 def add_comment(request, post_id):
     """Обрабатывает создания поста."""
@@ -82,11 +155,14 @@ def add_comment(request, post_id):
 @login_required
 def post_create(request):
     """Выводит шаблон создания поста."""
-    form_post = PostForm(request.POST or None)
+    form_post = PostForm(request.POST or None, files=request.FILES or None)
     if form_post.is_valid():
         form = form_post.save(commit=False)
         form.author = request.user
-        form.save()
+        with transaction.atomic():
+            form.save()
+            if form.image:
+                tasks.build_thumbnail.delay(form.pk)
         return redirect('posts:profile', request.user.username)
     context = {
         'form': form_post,
@@ -106,7 +182,16 @@ def post_edit(request, post_id):
         instance=post
     )
     if form.is_valid():
-        form.save()
+        with transaction.atomic():
+            image_changed = 'image' in form.changed_data
+            if image_changed:
+                # Пока воркер не построил новые, карточка показывает
+                # саму картинку, а не миниатюру и варианты прежней.
+                post.image_thumbnail = ''
+                variants.clear(post)
+            form.save()
+            if image_changed and post.image:
+                tasks.build_thumbnail.delay(post.id)
         return redirect('posts:post_detail', post_id=post.id)
     context = {
         'form': form,
@@ -116,14 +201,11 @@ def post_edit(request, post_id):
 
 
 @login_required
+@read_from_replica
 def follow_index(request):
-    posts_list = Post.objects.filter(
-        author__following__user=request.user
-    ).select_related(
-        'author', 'group'
-    )
-    page_number = request.GET.get('page')
-    context = {'page_obj': page_breakdown(page_number, posts_list)}
+    page_obj = page_breakdown(request, feed_for(request.user))
+    page_obj.object_list = [entry.post for entry in page_obj]
+    context = {'page_obj': page_obj}
     return render(request, 'posts/follow.html', context)
 
 
@@ -131,14 +213,21 @@ def follow_index(request):
 def profile_follow(request, username):
     author = get_object_or_404(User, username=username)
     if author != request.user:
-        Follow.objects.get_or_create(user=request.user, author=author)
-    return redirect('posts:profile', username=username)
+        with transaction.atomic():
+            Follow.objects.get_or_create(user=request.user, author=author)
+    # Подписка меняется GET-запросом, который middleware не закрепляет.
+    response = redirect('posts:profile', username=username)
+    pin_to_primary(response)
+    return response
 
 
 @login_required
 def profile_unfollow(request, username):
-    Follow.objects.filter(
-        user=request.user,
-        author__username=username
-    ).delete()
-    return redirect('posts:profile', username=username)
+    with transaction.atomic():
+        Follow.objects.filter(
+            user=request.user,
+            author__username=username
+        ).delete()
+    response = redirect('posts:profile', username=username)
+    pin_to_primary(response)
+    return response
@@ -0,0 +1,28 @@
+"""
+ASGI config for yatube project.
+
+It exposes the ASGI callable as a module-level variable named ``application``.
+Django 2.2 has no native ASGI support, so core.asgi.ASGIHandler adapts the
+WSGI handler: request bodies and responses are streamed by the event loop,
+views run in a thread pool of ASGI_THREADS workers.
+
+Run with any ASGI server, for example:
+
+    uvicorn yatube.asgi:application --workers 4 --limit-concurrency 1000
+"""
+
+import os
+
+from django.conf import settings
+from django.core.wsgi import get_wsgi_application
+
+from core.asgi import ASGIHandler
+from core.templates import warm_up
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
+
+application = ASGIHandler(
+    get_wsgi_application(), workers=settings.ASGI_THREADS
+)
+
+warm_up()
@@ -0,0 +1,59 @@
+"""
+Боевой профиль: DJANGO_SETTINGS_MODULE=yatube.settings_production.
+
+Наследует yatube.settings, выключает DEBUG и всё, что в нём копится
+или тормозит на горячем пути, а секреты и адреса берёт из окружения:
+
+    DJANGO_SECRET_KEY       обязателен
+    DJANGO_ALLOWED_HOSTS    домены через запятую, обязателен
+    DATABASE_URL, DATABASE_REPLICA_URLS, DATABASE_CONN_MAX_AGE,
+    DATABASE_POOLER         см. yatube.settings
+    TEMPLATE_CACHE          1 по умолчанию
+    SESSION_ENGINE          по умолчанию cached_db
+
+Перед запуском: python manage.py self_check
+"""
+
+import copy
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+from core.templates import template_loaders
+
+from .settings import *  # noqa: F401,F403
+from .settings import TEMPLATES
+
+
+def _required(name):
+    value = os.environ.get(name)
+    if not value:
+        raise ImproperlyConfigured(f'Переменная окружения {name} не задана')
+    return value
+
+
+DEBUG = False
+SECRET_KEY = _required('DJANGO_SECRET_KEY')
+ALLOWED_HOSTS = [
+    host.strip()
+    for host in _required('DJANGO_ALLOWED_HOSTS').split(',')
+    if host.strip()
+]
+
+# Шаблоны разбираются один раз на процесс, при старте.
+TEMPLATE_CACHE = os.environ.get('TEMPLATE_CACHE', '1') == '1'
+TEMPLATE_PRECOMPILE = TEMPLATE_CACHE
+TEMPLATES = copy.deepcopy(TEMPLATES)
+for backend in TEMPLATES:
+    backend['OPTIONS']['loaders'] = template_loaders(TEMPLATE_CACHE)
+
+# Сессия читается из кэша, а не отдельным запросом к базе на каждой
+# странице залогиненного пользователя.
+SESSION_ENGINE = os.environ.get(
+    'SESSION_ENGINE', 'django.contrib.sessions.backends.cached_db'
+)
+
+# Имена с хэшем содержимого и заранее сжатые копии: collectstatic.
+STATICFILES_STORAGE = 'core.storage.CompressedManifestStaticFilesStorage'
+
+TASKS_EAGER = False